@@ -508,8 +508,66 @@ def show_tokenizer_status(args):
     return 0
 
 
-def main():
+def _add_status_parser(subparsers):
+    status_parser = subparsers.add_parser("status", help="Show system status")
+    status_parser.set_defaults(func=show_status)
+
+
+def _add_test_parser(subparsers):
+    test_parser = subparsers.add_parser("test", help="Send a test event")
+    test_parser.add_argument("--event-type", default="PreToolUse", help="Event type")
+    test_parser.add_argument("--agent-name", default="test-agent", help="Agent name")
+    test_parser.add_argument("--session-id", default="test-session", help="Session ID")
+    test_parser.add_argument("--project", default="test-project", help="Project name")
+    test_parser.add_argument("--model", default="sonnet", help="Model name")
+    test_parser.set_defaults(func=send_test_event)
+
+
+def _add_doctor_parser(subparsers):
+    doctor_parser = subparsers.add_parser("doctor", help="Diagnose installation issues")
+    doctor_parser.set_defaults(func=run_doctor)
+
+
+def _add_logs_parser(subparsers):
+    logs_parser = subparsers.add_parser("logs", help="View event logs")
+    logs_parser.add_argument("-n", "--lines", type=int, default=50, help="Number of lines to show")
+    logs_parser.add_argument("-f", "--follow", action="store_true", help="Follow log output")
+    logs_parser.set_defaults(func=show_logs)
+
+
+def _add_config_parser(subparsers):
+    config_parser = subparsers.add_parser("config", help="Show configuration")
+    config_parser.set_defaults(func=show_config)
+
+
+def _add_tokenizer_parser(subparsers):
+    tokenizer_parser = subparsers.add_parser(
+        'tokenizer',
+        help='Show tokenizer status and diagnostics'
+    )
+    tokenizer_parser.add_argument(
+        '--test-text', '-t',
+        help='Test text to tokenize'
+    )
+    tokenizer_parser.set_defaults(func=show_tokenizer_status)
+
+
+# Subcommand name -> parser builder; main() only builds the one being run
+_SUBCOMMAND_PARSERS = {
+    "status": _add_status_parser,
+    "test": _add_test_parser,
+    "doctor": _add_doctor_parser,
+    "logs": _add_logs_parser,
+    "config": _add_config_parser,
+    "tokenizer": _add_tokenizer_parser,
+}
+
+
+def main(argv=None):
     """Main CLI entry point."""
+    if argv is None:
+        argv = sys.argv[1:]
+
     parser = argparse.ArgumentParser(
         description="Agent Dashboard - Multi-Agent Monitoring for Claude Code",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -548,45 +606,16 @@ Examples:
 
     subparsers = parser.add_subparsers(dest="command", help="Commands")
 
-    # Status command
-    status_parser = subparsers.add_parser("status", help="Show system status")
-    status_parser.set_defaults(func=show_status)
-
-    # Test command
-    test_parser = subparsers.add_parser("test", help="Send a test event")
-    test_parser.add_argument("--event-type", default="PreToolUse", help="Event type")
-    test_parser.add_argument("--agent-name", default="test-agent", help="Agent name")
-    test_parser.add_argument("--session-id", default="test-session", help="Session ID")
-    test_parser.add_argument("--project", default="test-project", help="Project name")
-    test_parser.add_argument("--model", default="sonnet", help="Model name")
-    test_parser.set_defaults(func=send_test_event)
-
-    # Doctor command
-    doctor_parser = subparsers.add_parser("doctor", help="Diagnose installation issues")
-    doctor_parser.set_defaults(func=run_doctor)
-
-    # Logs command
-    logs_parser = subparsers.add_parser("logs", help="View event logs")
-    logs_parser.add_argument("-n", "--lines", type=int, default=50, help="Number of lines to show")
-    logs_parser.add_argument("-f", "--follow", action="store_true", help="Follow log output")
-    logs_parser.set_defaults(func=show_logs)
-
-    # Config command
-    config_parser = subparsers.add_parser("config", help="Show configuration")
-    config_parser.set_defaults(func=show_config)
-
-    # Tokenizer status subcommand
-    tokenizer_parser = subparsers.add_parser(
-        'tokenizer',
-        help='Show tokenizer status and diagnostics'
-    )
-    tokenizer_parser.add_argument(
-        '--test-text', '-t',
-        help='Test text to tokenize'
-    )
-    tokenizer_parser.set_defaults(func=show_tokenizer_status)
+    # Register only the requested subcommand; help, dashboard launches and
+    # unknown commands need the full list
+    command = next((arg for arg in argv if arg in _SUBCOMMAND_PARSERS), None)
+    if command is not None:
+        _SUBCOMMAND_PARSERS[command](subparsers)
+    else:
+        for add_parser in _SUBCOMMAND_PARSERS.values():
+            add_parser(subparsers)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Handle commands
     if hasattr(args, "func"):
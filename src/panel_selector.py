@@ -255,13 +255,28 @@ class PanelSizeSelector:
             thresholds: Optional custom thresholds [(score, panel_size), ...]
             db_path: Optional path to SQLite audit database
         """
-        self.thresholds = thresholds or PANEL_THRESHOLDS.copy()
+        self.thresholds = thresholds or PANEL_THRESHOLDS
         self.db_path = Path(db_path).expanduser() if db_path else None
         self.selection_log: List[PanelSelection] = []
 
         if self.db_path:
             self._init_db()
 
+    @property
+    def thresholds(self) -> Tuple[Tuple[int, int], ...]:
+        """Score thresholds as ((score, panel_size), ...).
+
+        Stored as a tuple, so thresholds are changed by assigning a new
+        sequence rather than by editing them in place.
+        """
+        return self._thresholds
+
+    @thresholds.setter
+    def thresholds(self, value: List[Tuple[int, int]]) -> None:
+        # Sorted once here rather than on every score_to_panel_size call
+        self._thresholds = tuple(value)
+        self._thresholds_desc = sorted(self._thresholds, reverse=True)
+
     def _init_db(self) -> None:
         """Initialize audit database."""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -331,7 +346,7 @@ class PanelSizeSelector:
         Returns:
             Panel size (3, 5, or 7)
         """
-        for threshold, size in sorted(self.thresholds, reverse=True):
+        for threshold, size in self._thresholds_desc:
             if score >= threshold:
                 return size
         return 3  # Default to smallest panel
@@ -99,22 +99,34 @@ except Exception as e:
 
 
 # Tier 3: tiktoken Fallback
+# Loaded on first use: get_encoding() reads (or downloads) the BPE file,
+# which is wasted work for every process that never reaches this tier.
 _tiktoken_encoding = None
 _TIKTOKEN_AVAILABLE = False
 _tiktoken_error = None
+_tiktoken_loaded = False
 
-try:
-    import tiktoken
-    _tiktoken_encoding = tiktoken.get_encoding("cl100k_base")
-    _TIKTOKEN_AVAILABLE = True
-    logger.info("tiktoken fallback loaded (cl100k_base)")
-except ImportError as e:
-    _tiktoken_error = f"tiktoken not installed: {e}"
-    logger.debug(f"tiktoken not available: {_tiktoken_error}")
-except Exception as e:
-    # Network errors can occur when downloading encoding files
-    _tiktoken_error = f"Failed to load encoding: {e}"
-    logger.warning(f"tiktoken failed: {_tiktoken_error}")
+
+def _load_tiktoken() -> bool:
+    """Import tiktoken and load cl100k_base once; return availability."""
+    global _tiktoken_encoding, _TIKTOKEN_AVAILABLE, _tiktoken_error, _tiktoken_loaded
+    if _tiktoken_loaded:
+        return _TIKTOKEN_AVAILABLE
+    try:
+        import tiktoken
+        _tiktoken_encoding = tiktoken.get_encoding("cl100k_base")
+        _TIKTOKEN_AVAILABLE = True
+        logger.info("tiktoken fallback loaded (cl100k_base)")
+    except ImportError as e:
+        _tiktoken_error = f"tiktoken not installed: {e}"
+        logger.debug(f"tiktoken not available: {_tiktoken_error}")
+    except Exception as e:
+        # Network errors can occur when downloading encoding files
+        _tiktoken_error = f"Failed to load encoding: {e}"
+        logger.warning(f"tiktoken failed: {_tiktoken_error}")
+    finally:
+        _tiktoken_loaded = True
+    return _TIKTOKEN_AVAILABLE
 
 
 # =============================================================================
@@ -169,7 +181,7 @@ def count_tokens(
             return result
 
     # Tier 3: tiktoken fallback
-    if _TIKTOKEN_AVAILABLE:
+    if _load_tiktoken():
         return _count_with_tiktoken(text)
 
     # Tier 4: Character estimation
@@ -255,7 +267,7 @@ def get_tokenizer_info() -> TokenizerInfo:
             requires_network=True,
             is_available=True
         )
-    elif _TIKTOKEN_AVAILABLE:
+    elif _load_tiktoken():
         return TokenizerInfo(
             tier=TokenizerTier.TIKTOKEN,
             name="tiktoken (cl100k_base)",
@@ -281,6 +293,7 @@ def get_all_tokenizers_status() -> Dict[str, TokenizerInfo]:
     Returns:
         Dictionary mapping tier names to their status
     """
+    _load_tiktoken()
     return {
         "claude-hf": TokenizerInfo(
             tier=TokenizerTier.CLAUDE_HF,
@@ -335,7 +348,7 @@ def _count_with_tier(text: str, tier: TokenizerTier, model: str) -> int:
             raise RuntimeError("Anthropic API call failed")
         return result
     elif tier == TokenizerTier.TIKTOKEN:
-        if not _TIKTOKEN_AVAILABLE:
+        if not _load_tiktoken():
             raise RuntimeError(f"tiktoken not available: {_tiktoken_error}")
         return _count_with_tiktoken(text)
     else:
@@ -360,9 +373,35 @@ def _count_with_anthropic_api(text: str, model: str) -> Optional[int]:
         return None
 
 
+# Texts longer than this are split and encoded as a batch by tiktoken
+_TIKTOKEN_WINDOW_CHARS = 100_000
+
+
+def _split_windows(text: str, size: int) -> List[str]:
+    """Split text into chunks of at most size chars, preferring line breaks."""
+    chunks = []
+    start = 0
+    while len(text) - start > size:
+        cut = text.rfind("\n", start, start + size) + 1
+        if cut <= start:
+            cut = start + size
+        chunks.append(text[start:cut])
+        start = cut
+    chunks.append(text[start:])
+    return chunks
+
+
 def _count_with_tiktoken(text: str) -> int:
-    """Count tokens using tiktoken (OpenAI tokenizer)."""
-    return len(_tiktoken_encoding.encode(text))
+    """Count tokens using tiktoken (OpenAI tokenizer).
+
+    Special tokens are encoded as ordinary text, which skips the special
+    token scan and cannot raise on prompts that mention them. Long texts
+    are encoded in parallel windows by tiktoken's batch API.
+    """
+    if len(text) <= _TIKTOKEN_WINDOW_CHARS:
+        return len(_tiktoken_encoding.encode_ordinary(text))
+    windows = _split_windows(text, _TIKTOKEN_WINDOW_CHARS)
+    return sum(map(len, _tiktoken_encoding.encode_ordinary_batch(windows)))
 
 
 def _count_with_characters(text: str) -> int:
@@ -25,6 +25,9 @@ Version: 2.6.0
 """
 
 import asyncio
+import concurrent.futures
+import functools
+import hashlib
 import json
 import os
 import sqlite3
@@ -32,9 +35,10 @@ import socket
 import subprocess
 import sys
 import re
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 import argparse
 
@@ -282,6 +286,45 @@ def check_port_and_handle(port: int, force: bool = False, auto_port: bool = Fals
         return port, False
 
 
+# In-memory event buffer size; also the upper bound for /api/events?limit=
+MAX_EVENTS_LIMIT = 500
+
+# Event persistence batching: flush after this many events or this many ms
+DB_BATCH_SIZE = 512
+DB_FLUSH_MS = 50
+
+# Seconds a single WebSocket send may take before the client is dropped
+WS_SEND_TIMEOUT = 1.0
+
+# Outbound messages buffered per WebSocket client; the oldest is dropped when full
+WS_QUEUE_SIZE = 1000
+
+INSERT_EVENT_SQL = """
+    INSERT INTO events
+    (timestamp, agent_name, event_type, session_id, project,
+     model, tokens_in, tokens_out, cost, payload, ts_epoch)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def iso_to_epoch(timestamp: str) -> Optional[int]:
+    """Convert an ISO-8601 timestamp to integer Unix seconds.
+
+    Naive timestamps are interpreted as local time, matching the hooks'
+    ``datetime.now().isoformat()``. Returns None if the string is unparseable.
+    """
+    epoch = _iso_to_epoch_float(timestamp)
+    return None if epoch is None else int(epoch)
+
+
+def _iso_to_epoch_float(timestamp: str) -> Optional[float]:
+    """Like ``iso_to_epoch`` but keeps sub-second precision."""
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
 # Theme colors matching claude-powerline.json
 THEME = {
     "directory": "#7dcfff",
@@ -1182,15 +1225,32 @@ DASHBOARD_HTML = """
 """
 
 
+@functools.lru_cache(maxsize=8)
+def _render_index(port: int) -> Tuple[bytes, str]:
+    """Dashboard page bytes and ETag for a port, built once per process."""
+    body = DASHBOARD_HTML.replace("{port}", str(port)).encode("utf-8")
+    return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
 class WebDashboard:
     """Web dashboard server with WebSocket support."""
 
     def __init__(self, db_path: str = "~/.claude/agent_dashboard.db", port: int = 4200):
         self.db_path = Path(db_path).expanduser()
         self.port = port
-        self.ws_clients: Set[web.WebSocketResponse] = set()
+        # Each client has a bounded outbound queue drained by its own sender task
+        self.ws_clients: Dict[web.WebSocketResponse, asyncio.Queue] = {}
+        self._last_stats: Optional[Dict] = None
+        # Dashboard page is static per port, so render and hash it once
+        self._index_bytes, self._index_etag = _render_index(self.port)
         self.sessions: Dict[str, Any] = {}
         self.events: List[Dict] = []
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        # Single writer thread keeps fsync latency off the event loop; it
+        # lives from writer startup to cleanup
+        self._db_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
         self._init_db()
         self._load_recent_data()
 
@@ -1216,14 +1276,105 @@ class WebDashboard:
                     tokens_in INTEGER DEFAULT 0,
                     tokens_out INTEGER DEFAULT 0,
                     cost REAL DEFAULT 0.0,
-                    payload TEXT
+                    payload TEXT,
+                    ts_epoch INTEGER
                 )
             """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+            if "ts_epoch" not in columns:
+                # Migrate databases created before the epoch column existed
+                conn.execute("ALTER TABLE events ADD COLUMN ts_epoch INTEGER")
+                rows = conn.execute("SELECT id, timestamp FROM events").fetchall()
+                conn.executemany(
+                    "UPDATE events SET ts_epoch = ? WHERE id = ?",
+                    [(iso_to_epoch(ts), rowid) for rowid, ts in rows]
+                )
             conn.execute("CREATE INDEX IF NOT EXISTS idx_events_session ON events(session_id)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp DESC)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_events_project ON events(project)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_ts_epoch ON events(ts_epoch)")
             conn.commit()
     
+    def _get_write_conn(self) -> sqlite3.Connection:
+        """Return the persistent connection used for event inserts."""
+        if self._write_conn is None:
+            # Autocommit mode so transactions are controlled explicitly
+            self._write_conn = sqlite3.connect(
+                self.db_path, isolation_level=None, check_same_thread=False
+            )
+            self._write_conn.execute("PRAGMA journal_mode=WAL")
+        return self._write_conn
+
+    def _flush_batch(self, rows: List[tuple]):
+        """Insert a batch of event rows in a single transaction."""
+        conn = self._get_write_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(INSERT_EVENT_SQL, rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    async def _db_writer(self):
+        """Drain queued events into SQLite in batches.
+
+        Collects up to DB_BATCH_SIZE rows or waits at most DB_FLUSH_MS after
+        the first row, then writes them with one commit. A ``None`` item
+        flushes what has been collected and stops the writer.
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._write_queue
+        running = True
+        while running:
+            row = await queue.get()
+            if row is None:
+                break
+            rows = [row]
+            deadline = loop.time() + DB_FLUSH_MS / 1000
+            while len(rows) < DB_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    running = False
+                    break
+                rows.append(row)
+            try:
+                await loop.run_in_executor(self._db_executor, self._flush_batch, rows)
+            except Exception as e:
+                # Keep draining: a dead writer would let the queue grow unbounded
+                print(f"Warning: failed to persist {len(rows)} events: {e!r}")
+
+    async def _start_db_writer(self, app):
+        """Start the batched database writer (aiohttp startup hook)."""
+        if self._db_executor is None:
+            self._db_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="sqlite-writer"
+            )
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._db_writer())
+
+    async def _stop_db_writer(self, app):
+        """Flush pending events, then close the write connection and thread (cleanup hook)."""
+        if self._writer_task is not None:
+            self._write_queue.put_nowait(None)
+            await self._writer_task
+            self._writer_task = None
+            self._write_queue = None
+        if self._write_conn is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                self._db_executor, self._write_conn.close
+            )
+            self._write_conn = None
+        if self._db_executor is not None:
+            self._db_executor.shutdown(wait=True)
+            self._db_executor = None
+
     def _load_recent_data(self):
         """Load recent events from database."""
         with sqlite3.connect(self.db_path) as conn:
@@ -1281,13 +1432,17 @@ class WebDashboard:
     
     def _get_stats(self) -> Dict:
         """Get aggregate statistics."""
-        since = (datetime.now() - timedelta(hours=24)).isoformat()
+        since = int(time.time()) - 86400
+        # Writers that predate ts_epoch (agent_monitor) leave it NULL, so
+        # those rows fall back to comparing the ISO timestamp
+        since_iso = datetime.fromtimestamp(since).isoformat()
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.execute("""
                 SELECT COUNT(*), COUNT(DISTINCT session_id), 
                        SUM(tokens_in + tokens_out), SUM(cost)
-                FROM events WHERE timestamp > ?
-            """, (since,))
+                FROM events
+                WHERE ts_epoch > ? OR (ts_epoch IS NULL AND timestamp > ?)
+            """, (since, since_iso))
             row = cursor.fetchone()
             return {
                 "total_events": row[0] or 0,
@@ -1379,15 +1534,30 @@ class WebDashboard:
     
     async def handle_index(self, request):
         """Serve the dashboard HTML."""
-        html = DASHBOARD_HTML.replace("{port}", str(self.port))
-        return web.Response(text=html, content_type="text/html")
+        if request.headers.get("If-None-Match") == self._index_etag:
+            return web.Response(status=304, headers={"ETag": self._index_etag})
+        return web.Response(
+            body=self._index_bytes,
+            content_type="text/html",
+            charset="utf-8",
+            headers={"ETag": self._index_etag}
+        )
     
     async def handle_events_post(self, request):
         """Receive events from hooks."""
         try:
             data = await request.json()
+            # Only format a timestamp when the hook did not send one; in that
+            # case the epoch is already known and needs no parsing.
+            timestamp = data.get("timestamp")
+            if timestamp:
+                ts_epoch = iso_to_epoch(timestamp)
+            else:
+                now = time.time()
+                timestamp = datetime.fromtimestamp(now).isoformat()
+                ts_epoch = int(now)
             event = {
-                "timestamp": data.get("timestamp", datetime.now().isoformat()),
+                "timestamp": timestamp,
                 "agent_name": data.get("agent_name", "unknown"),
                 "event_type": data.get("event_type", "unknown"),
                 "session_id": data.get("session_id", "default"),
@@ -1399,24 +1569,21 @@ class WebDashboard:
                 "payload": data.get("payload", {})
             }
             
-            # Store in database
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT INTO events 
-                    (timestamp, agent_name, event_type, session_id, project, 
-                     model, tokens_in, tokens_out, cost, payload)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    event["timestamp"], event["agent_name"], event["event_type"],
-                    event["session_id"], event["project"], event["model"],
-                    event["tokens_in"], event["tokens_out"], event["cost"],
-                    json.dumps(event["payload"])
-                ))
-                conn.commit()
+            # Queue for the batched database writer
+            row = (
+                event["timestamp"], event["agent_name"], event["event_type"],
+                event["session_id"], event["project"], event["model"],
+                event["tokens_in"], event["tokens_out"], event["cost"],
+                json.dumps(event["payload"]), ts_epoch
+            )
+            if self._write_queue is not None:
+                self._write_queue.put_nowait(row)
+            else:
+                self._flush_batch([row])
             
             # Update in-memory state
             self.events.insert(0, event)
-            if len(self.events) > 500:
+            if len(self.events) > MAX_EVENTS_LIMIT:
                 self.events.pop()
             self._update_session(event)
             
@@ -1428,9 +1595,36 @@ class WebDashboard:
             return web.json_response({"error": str(e)}, status=400)
     
     async def handle_events_get(self, request):
-        """Get recent events."""
-        limit = int(request.query.get("limit", 100))
-        return web.json_response({"events": self.events[:limit]})
+        """Get recent events.
+
+        Query parameters:
+            limit: Maximum number of events to return (clamped to 1..500)
+            since: ISO timestamp; only events newer than this are returned
+        """
+        try:
+            limit = int(request.query.get("limit", 100))
+        except ValueError:
+            return web.json_response({"error": "limit must be an integer"}, status=400)
+        limit = max(1, min(limit, MAX_EVENTS_LIMIT))
+
+        since = request.query.get("since")
+        if not since:
+            return web.json_response({"events": self.events[:limit]})
+        since_epoch = _iso_to_epoch_float(since)
+        if since_epoch is None:
+            return web.json_response({"error": "since must be an ISO timestamp"}, status=400)
+
+        # The buffer is in arrival order, not strictly time order, so every
+        # event is checked. Timestamps are compared as instants, not strings.
+        events = []
+        for event in self.events:
+            epoch = _iso_to_epoch_float(event.get("timestamp"))
+            if epoch is None or epoch <= since_epoch:
+                continue
+            events.append(event)
+            if len(events) >= limit:
+                break
+        return web.json_response({"events": events})
     
     async def handle_sessions(self, request):
         """Get active sessions."""
@@ -1452,7 +1646,7 @@ class WebDashboard:
     
     async def handle_stats(self, request):
         """Get statistics."""
-        return web.json_response(self._get_stats())
+        return web.json_response(await asyncio.to_thread(self._get_stats))
     
     async def handle_health(self, request):
         """Health check."""
@@ -1641,17 +1835,20 @@ class WebDashboard:
         """WebSocket handler for live updates."""
         ws = web.WebSocketResponse()
         await ws.prepare(request)
-        
-        self.ws_clients.add(ws)
-        
-        # Send initial data
-        await ws.send_json({
+
+        stats = await asyncio.to_thread(self._get_stats)
+
+        # Queue initial data first, then register so broadcasts follow it
+        queue: asyncio.Queue = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+        queue.put_nowait(json.dumps({
             "type": "init",
             "events": self.events[:50],
             "sessions": self.sessions,
-            "stats": self._get_stats()
-        })
-        
+            "stats": stats
+        }))
+        self.ws_clients[ws] = queue
+        sender = asyncio.create_task(self._ws_sender(ws, queue))
+
         try:
             async for msg in ws:
                 if msg.type == aiohttp.WSMsgType.TEXT:
@@ -1660,9 +1857,30 @@ class WebDashboard:
                 elif msg.type == aiohttp.WSMsgType.ERROR:
                     break
         finally:
-            self.ws_clients.discard(ws)
-        
+            self.ws_clients.pop(ws, None)
+            sender.cancel()
+
         return ws
+
+    async def _ws_sender(self, ws, queue: asyncio.Queue):
+        """Deliver queued messages to one WebSocket client.
+
+        A client whose send fails or stalls past WS_SEND_TIMEOUT is
+        unregistered and closed.
+        """
+        while True:
+            message = await queue.get()
+            try:
+                await asyncio.wait_for(ws.send_str(message), WS_SEND_TIMEOUT)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.ws_clients.pop(ws, None)
+                try:
+                    await ws.close()
+                except Exception:
+                    pass
+                return
     
     async def broadcast(self, data: Dict):
         """Broadcast message to all WebSocket clients."""
@@ -1670,21 +1888,31 @@ class WebDashboard:
             return
         
         message = json.dumps(data)
-        dead_clients = set()
-        
-        for client in self.ws_clients:
+
+        # Hand off to each client's sender task; a slow client only loses
+        # its own oldest frames instead of stalling ingest or growing memory.
+        for queue in self.ws_clients.values():
             try:
-                await client.send_str(message)
-            except Exception:
-                dead_clients.add(client)
-        
-        self.ws_clients -= dead_clients
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                queue.get_nowait()
+                queue.put_nowait(message)
     
     async def stats_broadcaster(self):
-        """Periodically broadcast stats updates."""
+        """Periodically broadcast stats updates.
+
+        Ticks with no connected clients or unchanged stats send nothing;
+        new clients receive current stats in their init message.
+        """
         while True:
             await asyncio.sleep(10)
-            await self.broadcast({"type": "stats", "stats": self._get_stats()})
+            if not self.ws_clients:
+                continue
+            stats = await asyncio.to_thread(self._get_stats)
+            if stats == self._last_stats:
+                continue
+            self._last_stats = stats
+            await self.broadcast({"type": "stats", "stats": stats})
     
     def create_app(self) -> web.Application:
         """Create the web application."""
@@ -1703,6 +1931,10 @@ class WebDashboard:
         app.router.add_post("/api/shutdown", self.handle_shutdown)
         app.router.add_get("/ws", self.handle_websocket)
 
+        # Batched event persistence
+        app.on_startup.append(self._start_db_writer)
+        app.on_cleanup.append(self._stop_db_writer)
+
         # Workflow engine routes
         if self.workflow_engine:
             app.router.add_post("/api/workflow", self.handle_workflow_create)
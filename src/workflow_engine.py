@@ -31,19 +31,33 @@ Usage:
     workflow.execute()
 """
 
+import bisect
+import contextlib
+import functools
+import itertools
 import json
+import operator
 import os
 import sys
-import hashlib
-import subprocess
+import time
+import weakref
+from collections import Counter, OrderedDict, deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum, auto
 from pathlib import Path
-from typing import Optional, Dict, List, Any, Callable
-import sqlite3
+from typing import (
+    TYPE_CHECKING, Optional, Dict, List, Any, Callable, ClassVar, Iterator, Set
+)
 import threading
 
+# subprocess and concurrent.futures (validation layers), sqlite3 (engine
+# persistence) and hashlib (tree fingerprints) are imported where used so
+# CLI startup does not pay for them; concurrent.futures alone pulls in logging
+if TYPE_CHECKING:
+    import sqlite3
+    import subprocess
+
 # Import centralized token counting
 try:
     from src.token_counter import count_tokens as _count_tokens, estimate_cost as _estimate_cost_from_module, get_tokenizer_info
@@ -57,6 +71,68 @@ except ImportError:
         return (input_tokens + output_tokens) * 0.000003  # Rough estimate
 
 
+@functools.lru_cache(maxsize=None)
+def _get_orjson():
+    """Optional fast JSON encoder, imported on first JSON dump (None if absent)."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def _dumps_pretty(obj: Any) -> str:
+    """Serialize to 2-space indented JSON, using orjson when installed.
+
+    Both paths keep non-ASCII text as is, so the output does not depend on
+    whether orjson is available.
+    """
+    orjson = _get_orjson()
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            pass  # Types orjson does not handle; fall back to stdlib
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def _dumps_compact(obj: Any) -> str:
+    """Serialize to single-line JSON, using orjson when installed.
+
+    Both paths give the same text for JSON-native data: no spaces,
+    non-ASCII kept as is, and datetimes rejected. They differ only on
+    NaN/Infinity, which orjson writes as null and the fallback rejects.
+    """
+    orjson = _get_orjson()
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_PASSTHROUGH_DATETIME).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+
+
+def _print_json(obj: Any):
+    """Print JSON for a person at a terminal, or compactly for a pipe."""
+    isatty = getattr(sys.stdout, "isatty", None)
+    dumps = _dumps_pretty if isatty is not None and isatty() else _dumps_compact
+    sys.stdout.write(dumps(obj) + "\n")
+
+
+# Texts longer than this are counted directly rather than retained in the
+# cache, which therefore holds at most ~1M characters of prompt text
+_TOKEN_CACHE_MAX_CHARS = 4_000
+
+# Texts shorter than this are estimated arithmetically without a tokenizer
+_TINY_TEXT_CHARS = 16
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_token_count(text: str) -> int:
+    """Count tokens with memoization for repeated prompts."""
+    return _count_tokens(text)
+
+
 # ============================================================================
 # ENUMS AND CONSTANTS
 # ============================================================================
@@ -107,45 +183,147 @@ MODEL_PRICING = {
     "haiku": {"input": 0.25, "output": 1.25},
 }
 
-# Agent registry with tier assignments
-AGENT_REGISTRY = {
+# Exact-match pricing for tier names and common model identifiers, so the
+# usual case in estimate_cost is a single dict lookup
+_MODEL_DISPATCH: Dict[str, Dict[str, float]] = {
+    **MODEL_PRICING,
+    "claude-3-opus": MODEL_PRICING["opus"],
+    "claude-opus-4": MODEL_PRICING["opus"],
+    "claude-opus-4-1": MODEL_PRICING["opus"],
+    "claude-3-sonnet": MODEL_PRICING["sonnet"],
+    "claude-3-5-sonnet": MODEL_PRICING["sonnet"],
+    "claude-3-7-sonnet": MODEL_PRICING["sonnet"],
+    "claude-sonnet-4": MODEL_PRICING["sonnet"],
+    "claude-sonnet-4-5": MODEL_PRICING["sonnet"],
+    "claude-3-haiku": MODEL_PRICING["haiku"],
+    "claude-3-5-haiku": MODEL_PRICING["haiku"],
+    "claude-haiku-4-5": MODEL_PRICING["haiku"],
+}
+
+
+def _classify_model_pricing(model_key: str) -> Dict[str, float]:
+    """Resolve pricing for an unlisted model id by family name (default: sonnet)."""
+    if "opus" in model_key:
+        return MODEL_PRICING["opus"]
+    if "sonnet" in model_key:
+        return MODEL_PRICING["sonnet"]
+    if "haiku" in model_key:
+        return MODEL_PRICING["haiku"]
+    return MODEL_PRICING["sonnet"]
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_model_pricing(model: str) -> Dict[str, float]:
+    """Pricing for a model name without an exact match, memoized per spelling."""
+    model_key = model.lower()
+    prices = _MODEL_DISPATCH.get(model_key)
+    if prices is None:
+        prices = _classify_model_pricing(model_key)
+    return prices
+
+# Agent registry rows (name, tier, role); the nested AGENT_REGISTRY dict is
+# only built when something asks for it
+_AGENT_ROWS = (
     # Tier 1 - Opus (Strategic/Quality)
-    "orchestrator": {"tier": AgentTier.OPUS, "role": "coordinator"},
-    "synthesis": {"tier": AgentTier.OPUS, "role": "synthesizer"},
-    "critic": {"tier": AgentTier.OPUS, "role": "reviewer"},
-    "planner": {"tier": AgentTier.OPUS, "role": "planner"},
+    ("orchestrator", AgentTier.OPUS, "coordinator"),
+    ("synthesis", AgentTier.OPUS, "synthesizer"),
+    ("critic", AgentTier.OPUS, "reviewer"),
+    ("planner", AgentTier.OPUS, "planner"),
 
     # Tier 2 - Sonnet (Analysis/Research)
-    "researcher": {"tier": AgentTier.SONNET, "role": "researcher"},
-    "perplexity-researcher": {"tier": AgentTier.SONNET, "role": "researcher"},
-    "research-judge": {"tier": AgentTier.SONNET, "role": "reviewer"},
-    "claude-md-auditor": {"tier": AgentTier.SONNET, "role": "auditor"},
-    "implementer": {"tier": AgentTier.SONNET, "role": "implementer"},
+    ("researcher", AgentTier.SONNET, "researcher"),
+    ("perplexity-researcher", AgentTier.SONNET, "researcher"),
+    ("research-judge", AgentTier.SONNET, "reviewer"),
+    ("claude-md-auditor", AgentTier.SONNET, "auditor"),
+    ("implementer", AgentTier.SONNET, "implementer"),
 
     # Panel Judges - Sonnet (Quality Evaluation)
-    "panel-coordinator": {"tier": AgentTier.SONNET, "role": "coordinator"},
-    "judge-technical": {"tier": AgentTier.SONNET, "role": "reviewer"},
-    "judge-completeness": {"tier": AgentTier.SONNET, "role": "reviewer"},
-    "judge-practicality": {"tier": AgentTier.SONNET, "role": "reviewer"},
-    "judge-adversarial": {"tier": AgentTier.SONNET, "role": "reviewer"},
-    "judge-user": {"tier": AgentTier.SONNET, "role": "reviewer"},
+    ("panel-coordinator", AgentTier.SONNET, "coordinator"),
+    ("judge-technical", AgentTier.SONNET, "reviewer"),
+    ("judge-completeness", AgentTier.SONNET, "reviewer"),
+    ("judge-practicality", AgentTier.SONNET, "reviewer"),
+    ("judge-adversarial", AgentTier.SONNET, "reviewer"),
+    ("judge-user", AgentTier.SONNET, "reviewer"),
 
     # Tier 3 - Haiku (Execution)
-    "web-search-researcher": {"tier": AgentTier.HAIKU, "role": "researcher"},
-    "summarizer": {"tier": AgentTier.HAIKU, "role": "synthesizer"},
-    "test-writer": {"tier": AgentTier.HAIKU, "role": "tester"},
-    "installer": {"tier": AgentTier.HAIKU, "role": "executor"},
-    "validator": {"tier": AgentTier.HAIKU, "role": "validator"},
+    ("web-search-researcher", AgentTier.HAIKU, "researcher"),
+    ("summarizer", AgentTier.HAIKU, "synthesizer"),
+    ("test-writer", AgentTier.HAIKU, "tester"),
+    ("installer", AgentTier.HAIKU, "executor"),
+    ("validator", AgentTier.HAIKU, "validator"),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_agent_registry() -> Dict[str, Dict[str, Any]]:
+    """Agent name -> {"tier", "role"} registry, built on first use."""
+    return {name: {"tier": tier, "role": role} for name, tier, role in _AGENT_ROWS}
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from workflow_engine import AGENT_REGISTRY` working lazily
+    if name == "AGENT_REGISTRY":
+        return get_agent_registry()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Flat agent -> model tier string map for per-event cost lookups
+_AGENT_TIER_STR: Dict[str, str] = {name: tier.value for name, tier, _ in _AGENT_ROWS}
+_DEFAULT_TIER_STR = AgentTier.SONNET.value
+
+# Agent used when a task has no registered agent, by TDD phase
+_PHASE_DEFAULT_AGENTS = {
+    WorkflowPhase.SPEC: ("planner", AgentTier.OPUS),
+    WorkflowPhase.TEST_DESIGN: ("test-writer", AgentTier.SONNET),  # Upgraded for design
+    WorkflowPhase.TEST_IMPL: ("test-writer", AgentTier.HAIKU),
+    WorkflowPhase.IMPLEMENT: ("implementer", AgentTier.SONNET),
+    WorkflowPhase.VALIDATE: ("validator", AgentTier.HAIKU),
+    WorkflowPhase.REVIEW: ("critic", AgentTier.OPUS),
+    WorkflowPhase.DELIVER: ("summarizer", AgentTier.HAIKU),
 }
+_FALLBACK_AGENT = ("researcher", AgentTier.SONNET)
 
 
 # ============================================================================
 # DATA CLASSES
 # ============================================================================
 
-@dataclass
-class Task:
-    """A single task in a workflow."""
+# ``__slots__`` on the hot dataclasses where supported (dataclass(slots=) is 3.10+)
+_DATACLASS_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Task attributes included in to_dict(); assigning one notifies the owning workflow
+_TASK_SERIALIZED_FIELDS = frozenset({
+    "id", "content", "active_form", "status", "assigned_agent", "phase",
+    "priority", "dependencies", "tokens_used", "cost",
+})
+
+
+# Placeholder change hook while the dataclass __init__ assigns the fields
+_TASK_INITIALISING = object()
+_object_setattr = object.__setattr__
+
+
+class _TaskState:
+    """Task bookkeeping kept out of the dataclass fields.
+
+    Slots on a plain base class do not show up in ``fields()``,
+    ``asdict()`` or ``replace()``.
+    """
+    __slots__ = ("_on_change", "_cached_dict", "_cached_json", "_sort_key")
+
+
+@dataclass(eq=False, **_DATACLASS_SLOTS)
+class Task(_TaskState):
+    """A single task in a workflow.
+
+    Assigning any serialized attribute drops the cached ``to_dict()``
+    result and calls ``_on_change`` (installed by ``Workflow.add_task``) so
+    the workflow can invalidate its cached todo list and skip
+    re-serializing unchanged tasks. The assignments made by ``__init__``
+    skip this tracking; ``__post_init__`` sets the caches up once. In-place
+    mutation of ``dependencies`` is not tracked. Tasks compare by
+    identity; ids are unique per workflow.
+    """
     id: str
     content: str
     active_form: str
@@ -161,24 +339,69 @@ class Task:
     completed_at: Optional[datetime] = None
     result: Optional[str] = None
     error: Optional[str] = None
+    sequence: int = 0  # Creation order within the workflow
+
+    def __new__(cls, *args, **kwargs):
+        self = object.__new__(cls)
+        # Lets __setattr__ skip change tracking for the __init__ assignments
+        _object_setattr(self, "_on_change", _TASK_INITIALISING)
+        return self
+
+    def __post_init__(self):
+        _object_setattr(self, "_sort_key", (-self.priority, self.sequence))
+        _object_setattr(self, "_cached_dict", None)
+        _object_setattr(self, "_cached_json", None)
+        _object_setattr(self, "_on_change", None)
+
+    def __setattr__(self, name: str, value: Any):
+        _object_setattr(self, name, value)
+        callback = self._on_change
+        if callback is _TASK_INITIALISING:
+            return
+        if name == "priority" or name == "sequence":
+            _object_setattr(self, "_sort_key", (-self.priority, self.sequence))
+        if name in _TASK_SERIALIZED_FIELDS:
+            _object_setattr(self, "_cached_dict", None)
+            _object_setattr(self, "_cached_json", None)
+            if callback is not None:
+                callback(self, name)
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
-        return {
-            "id": self.id,
-            "content": self.content,
-            "activeForm": self.active_form,
-            "status": self.status.value,
-            "assigned_agent": self.assigned_agent,
-            "phase": self.phase.name,
-            "priority": self.priority,
-            "dependencies": self.dependencies,
-            "tokens_used": self.tokens_used,
-            "cost": self.cost,
-        }
+        """Convert to dictionary for serialization.
 
+        The dict is cached until a serialized attribute is reassigned, so
+        callers must treat it as read-only.
+        """
+        cached = self._cached_dict
+        if cached is None:
+            cached = {
+                "id": self.id,
+                "content": self.content,
+                "activeForm": self.active_form,
+                "status": self.status.value,
+                "assigned_agent": self.assigned_agent,
+                "phase": self.phase.name,
+                "priority": self.priority,
+                "dependencies": self.dependencies,
+                "tokens_used": self.tokens_used,
+                "cost": self.cost,
+            }
+            object.__setattr__(self, "_cached_dict", cached)
+        return cached
+
+    def to_json(self) -> str:
+        """``json.dumps(self.to_dict())``, cached like the dict itself."""
+        cached = self._cached_json
+        if cached is None:
+            cached = json.dumps(self.to_dict())
+            object.__setattr__(self, "_cached_json", cached)
+        return cached
+
+
+_TASK_SORT_KEY = operator.attrgetter("_sort_key")
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class ValidationResult:
     """Result from a validation layer."""
     layer: str
@@ -188,7 +411,7 @@ class ValidationResult:
     timestamp: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class WorkflowCheckpoint:
     """Human-in-the-loop checkpoint."""
     name: str
@@ -200,7 +423,7 @@ class WorkflowCheckpoint:
     approved_by: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class BudgetState:
     """Tracks cost governance state."""
     limit: float
@@ -233,7 +456,7 @@ class CostCircuitBreaker:
     - Provides warnings at threshold levels
     """
 
-    WARNING_THRESHOLDS = [0.5, 0.75, 0.9]  # 50%, 75%, 90%
+    WARNING_THRESHOLDS = [0.5, 0.75, 0.9]  # 50%, 75%, 90%; must stay sorted
 
     def __init__(self, budget_limit: float = 1.0):
         self.budget = BudgetState(limit=budget_limit)
@@ -241,18 +464,27 @@ class CostCircuitBreaker:
         self._callbacks: List[Callable] = []
 
     def estimate_tokens(self, text: str) -> int:
-        """Estimate token count using centralized token counter."""
-        return _count_tokens(text) if text else 0
+        """Estimate token count using centralized token counter.
+
+        Repeated prompts (common in orchestrator loops) are served from an
+        LRU cache; very long texts bypass it to bound memory. Tiny strings
+        (agent names, short labels) use the ~4 chars/token estimate, which
+        is as close as a tokenizer gets at that size.
+        """
+        if not text:
+            return 0
+        if len(text) < _TINY_TEXT_CHARS:
+            return (len(text) + 3) // 4
+        if len(text) > _TOKEN_CACHE_MAX_CHARS:
+            return _count_tokens(text)
+        return _cached_token_count(text)
 
     def estimate_cost(self, tokens_in: int, tokens_out: int, model: str) -> float:
         """Calculate cost for token usage."""
-        model_key = model.lower()
-        for key in MODEL_PRICING:
-            if key in model_key:
-                prices = MODEL_PRICING[key]
-                return (tokens_in * prices["input"] + tokens_out * prices["output"]) / 1_000_000
-        # Default to sonnet
-        return (tokens_in * 3.0 + tokens_out * 15.0) / 1_000_000
+        prices = _MODEL_DISPATCH.get(model)
+        if prices is None:
+            prices = _resolve_model_pricing(model)
+        return (tokens_in * prices["input"] + tokens_out * prices["output"]) / 1_000_000
 
     def check_budget(self, estimated_cost: float) -> tuple[bool, str]:
         """
@@ -261,6 +493,11 @@ class CostCircuitBreaker:
         Returns:
             (allowed, message) tuple
         """
+        # A broken circuit stays broken until reset(), so a single attribute
+        # read is enough to reject without contending for the lock.
+        if self.budget.circuit_broken:
+            return False, "CIRCUIT BROKEN: Budget exhausted. Manual reset required."
+
         with self._lock:
             if self.budget.circuit_broken:
                 return False, "CIRCUIT BROKEN: Budget exhausted. Manual reset required."
@@ -271,18 +508,21 @@ class CostCircuitBreaker:
                 self.budget.circuit_broken = True
                 return False, f"BUDGET EXCEEDED: ${projected:.4f} > ${self.budget.limit:.4f}"
 
-            # Check warning thresholds
+            # Count the (ascending) warning thresholds reached; a jump past
+            # several thresholds counts all of them but reports once
             utilization = projected / self.budget.limit
-            for threshold in self.WARNING_THRESHOLDS:
-                if utilization >= threshold and self.budget.warnings_issued < self.WARNING_THRESHOLDS.index(threshold) + 1:
-                    self.budget.warnings_issued += 1
-                    return True, f"WARNING: Budget at {utilization*100:.0f}% (${projected:.4f}/${self.budget.limit:.4f})"
+            crossed = bisect.bisect_right(self.WARNING_THRESHOLDS, utilization)
+            if crossed > self.budget.warnings_issued:
+                self.budget.warnings_issued = crossed
+                return True, f"WARNING: Budget at {utilization*100:.0f}% (${projected:.4f}/${self.budget.limit:.4f})"
 
             return True, "OK"
 
     def record_usage(self, tokens_in: int, tokens_out: int, model: str) -> float:
         """Record token usage and return cost."""
         cost = self.estimate_cost(tokens_in, tokens_out, model)
+        # `+=` on attributes is a read-modify-write, not atomic under the GIL,
+        # so the increments stay locked; pricing is computed outside the lock.
         with self._lock:
             self.budget.spent += cost
             self.budget.tokens_in += tokens_in
@@ -295,23 +535,154 @@ class CostCircuitBreaker:
             self.budget = BudgetState(limit=new_limit or self.budget.limit)
 
     def get_status(self) -> Dict[str, Any]:
-        """Get current budget status."""
-        with self._lock:
-            return {
-                "limit": self.budget.limit,
-                "spent": self.budget.spent,
-                "remaining": self.budget.remaining,
-                "utilization": f"{self.budget.utilization:.1f}%",
-                "tokens_in": self.budget.tokens_in,
-                "tokens_out": self.budget.tokens_out,
-                "circuit_broken": self.budget.circuit_broken,
-            }
+        """Get current budget status.
+
+        Lock-free for status polling: each field read is atomic, and
+        remaining/utilization are derived from the same spent/limit values
+        reported. Fields may straddle a concurrent record_usage() call.
+        """
+        budget = self.budget  # reset() swaps in a new BudgetState
+        limit = budget.limit
+        spent = budget.spent
+        return {
+            "limit": limit,
+            "spent": spent,
+            "remaining": max(0, limit - spent),
+            "utilization": f"{(spent / limit * 100) if limit > 0 else 0:.1f}%",
+            "tokens_in": budget.tokens_in,
+            "tokens_out": budget.tokens_out,
+            "circuit_broken": budget.circuit_broken,
+        }
 
 
 # ============================================================================
 # VALIDATION LAYER STACK
 # ============================================================================
 
+# Directories never worth walking for project sources (hidden dirs such as
+# .git and .venv are skipped as well)
+_SKIP_SOURCE_DIRS = frozenset({"node_modules", "__pycache__", "venv", "site-packages"})
+
+
+def _iter_py_files(root: Path) -> Iterator[str]:
+    """Yield paths of .py files under root via an os.scandir walk.
+
+    DirEntry caches file type information, so this avoids the extra stat
+    calls of pathlib globbing, and callers can stop early with islice.
+    Hidden, vendored and cache directories are not descended into.
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        name = entry.name
+                        if not name.startswith(".") and name not in _SKIP_SOURCE_DIRS:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(".py") and entry.is_file():
+                        yield entry.path
+        except OSError:
+            continue
+
+
+def _run_with_tail(
+    cmd: List[str],
+    cwd: Path,
+    timeout: float,
+    stdout_lines: int = 50,
+    stderr_lines: int = 20
+) -> "subprocess.CompletedProcess":
+    """Run a command keeping only the last lines of its output.
+
+    Like ``subprocess.run(capture_output=True, text=True)``, but output is
+    streamed through bounded deques so verbose runs use constant memory.
+    Raises ``subprocess.TimeoutExpired`` after killing the process.
+    """
+    import subprocess
+
+    proc = subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, bufsize=1
+    )
+    stdout_tail: deque = deque(maxlen=stdout_lines)
+    stderr_tail: deque = deque(maxlen=stderr_lines)
+    readers = [
+        threading.Thread(target=stdout_tail.extend, args=(proc.stdout,), daemon=True),
+        threading.Thread(target=stderr_tail.extend, args=(proc.stderr,), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    try:
+        returncode = proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        for reader in readers:
+            reader.join()
+        proc.stdout.close()
+        proc.stderr.close()
+    return subprocess.CompletedProcess(
+        cmd, returncode, "".join(stdout_tail), "".join(stderr_tail)
+    )
+
+
+# Git's well-known empty tree, used as the base when HEAD has no parent
+_GIT_EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+# Working tree fingerprints whose run_all_layers results are retained
+_VALIDATION_MEMO_SIZE = 32
+
+
+def _has_error(result: ValidationResult) -> bool:
+    """Whether a layer, or one of its checks, could not execute."""
+    if "error" in result.details:
+        return True
+    return any("error" in check for check in result.details.get("checks", ()))
+
+
+def _parse_numstat(output: str) -> Dict[str, Any]:
+    """Build diff details from `git diff --numstat -z` output.
+
+    Returns the changed file names, a summary identical to
+    `git diff --shortstat` (stripped) and a per-file listing. The listing
+    is ``path | +added -deleted`` (``Bin`` for binary files) followed by the
+    summary; unlike `--stat` it has no width-scaled +/- bars.
+    """
+    stat_lines = []
+    changed_files = []
+    insertions = deletions = 0
+    for record in output.split("\0"):
+        if not record:
+            continue
+        added, deleted, path = record.split("\t", 2)
+        changed_files.append(path)
+        if added == "-":  # Binary file
+            stat_lines.append(f" {path} | Bin")
+            continue
+        insertions += int(added)
+        deletions += int(deleted)
+        stat_lines.append(f" {path} | +{added} -{deleted}")
+
+    shortstat = ""
+    if changed_files:
+        # Same wording and omissions as git's print_stat_summary()
+        count = len(changed_files)
+        parts = [f"{count} file{'s' if count != 1 else ''} changed"]
+        if insertions or not deletions:
+            parts.append(f"{insertions} insertion{'s' if insertions != 1 else ''}(+)")
+        if deletions or not insertions:
+            parts.append(f"{deletions} deletion{'s' if deletions != 1 else ''}(-)")
+        shortstat = ", ".join(parts)
+    return {
+        "diff_stat": "\n".join(stat_lines + ([" " + shortstat] if shortstat else [])),
+        "changed_files": changed_files,
+        "shortstat": shortstat,
+    }
+
+
 class ValidationLayerStack:
     """
     Six-Layer Validation Stack (Design Shift 5).
@@ -327,6 +698,109 @@ class ValidationLayerStack:
     def __init__(self, project_root: str = "."):
         self.project_root = Path(project_root)
         self.results: List[ValidationResult] = []
+        # Built once; per-file paths are joined as plain strings
+        self._root_str = str(self.project_root)
+        self._tsconfig_path = self.project_root / "tsconfig.json"
+        self._package_json_path = self.project_root / "package.json"
+        # Files changed against HEAD as of the last Layer 1 run (None: unknown)
+        self._changed_files_cache: Optional[frozenset] = None
+        # run_all_layers results keyed by working tree fingerprint, least
+        # recently used first
+        self._memo: "OrderedDict[str, List[ValidationResult]]" = OrderedDict()
+
+    def _tree_fingerprint(self, changed: Optional[frozenset]) -> Optional[str]:
+        """Hash identifying the working tree: HEAD plus stats of changed files.
+
+        Unchanged tracked files match HEAD, so the commit id and the
+        (path, mtime, size) of every changed file identify the tree without
+        reading file contents. Returns None outside a git checkout.
+        """
+        import hashlib
+        import subprocess
+
+        if changed is None:
+            return None
+        try:
+            head = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True, text=True, timeout=5,
+                cwd=self.project_root
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if head.returncode != 0:
+            return None
+        parts = [head.stdout.strip()]
+        for path in sorted(changed):
+            try:
+                st = os.stat(os.path.join(self._root_str, path))
+                parts.append(f"{path}\0{st.st_mtime_ns}\0{st.st_size}")
+            except OSError:
+                parts.append(f"{path}\0deleted")
+        # Hash the joined buffer in one call rather than one update() per file;
+        # the key never leaves the process, so BLAKE2b's speed wins over SHA-256
+        return hashlib.blake2b("\0".join(parts).encode(), digest_size=32).hexdigest()
+
+    def _git_changed_files(self) -> Optional[frozenset]:
+        """Paths (relative to project_root) changed against HEAD, plus untracked files.
+
+        Returns None when git state is unavailable (not a repository, no
+        commits yet, git missing), in which case callers check everything.
+        """
+        import subprocess
+
+        try:
+            tracked = subprocess.run(
+                ["git", "diff", "--name-only", "-z", "--relative", "HEAD"],
+                capture_output=True, text=True, timeout=5,
+                cwd=self.project_root
+            )
+            untracked = subprocess.run(
+                ["git", "ls-files", "-z", "--others", "--exclude-standard"],
+                capture_output=True, text=True, timeout=5,
+                cwd=self.project_root
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if tracked.returncode != 0 or untracked.returncode != 0:
+            return None
+        return frozenset(p for p in (tracked.stdout + untracked.stdout).split("\0") if p)
+
+    def _check_typescript(self) -> Dict[str, Any]:
+        """Run the TypeScript compiler in no-emit mode."""
+        import subprocess
+
+        try:
+            result = subprocess.run(
+                ["npx", "tsc", "--noEmit"],
+                capture_output=True, text=True, timeout=60,
+                cwd=self.project_root
+            )
+            if result.returncode != 0:
+                return {"check": "typescript", "passed": False, "output": result.stderr[:500]}
+            return {"check": "typescript", "passed": True}
+        except Exception as e:
+            return {"check": "typescript", "passed": False, "error": str(e)}
+
+    def _check_python_syntax(self, py_files: List[str]) -> Dict[str, Any]:
+        """Byte-compile Python sources in-process to catch syntax errors.
+
+        Paths are relative to project_root. Compiling here rather than via
+        ``python3 -m py_compile`` avoids starting a second interpreter.
+        """
+        import py_compile
+
+        errors = []
+        for path in py_files:
+            try:
+                py_compile.compile(os.path.join(self._root_str, path), doraise=True)
+            except py_compile.PyCompileError as e:
+                errors.append(e.msg)
+            except OSError as e:
+                errors.append(str(e))
+        if errors:
+            return {"check": "python_syntax", "passed": False, "output": "\n".join(errors)[:500]}
+        return {"check": "python_syntax", "passed": True}
 
     def run_layer_1_static_analysis(self) -> ValidationResult:
         """
@@ -334,41 +808,50 @@ class ValidationLayerStack:
         - TypeScript/ESLint checks
         - Import validation
         - Formatting verification
-        """
-        checks = []
-        passed = True
 
-        # TypeScript check
-        if (self.project_root / "tsconfig.json").exists():
-            try:
-                result = subprocess.run(
-                    ["npx", "tsc", "--noEmit"],
-                    capture_output=True, text=True, timeout=60,
-                    cwd=self.project_root
-                )
-                if result.returncode != 0:
-                    passed = False
-                    checks.append({"check": "typescript", "passed": False, "output": result.stderr[:500]})
-                else:
-                    checks.append({"check": "typescript", "passed": True})
-            except Exception as e:
-                checks.append({"check": "typescript", "passed": False, "error": str(e)})
-
-        # Python type check (if applicable)
-        if list(self.project_root.glob("**/*.py")):
-            try:
-                result = subprocess.run(
-                    ["python3", "-m", "py_compile"] + [str(f) for f in self.project_root.glob("**/*.py")][:10],
-                    capture_output=True, text=True, timeout=30,
-                    cwd=self.project_root
-                )
-                if result.returncode != 0:
-                    passed = False
-                    checks.append({"check": "python_syntax", "passed": False, "output": result.stderr[:500]})
-                else:
-                    checks.append({"check": "python_syntax", "passed": True})
-            except Exception as e:
-                checks.append({"check": "python_syntax", "passed": False, "error": str(e)})
+        Applicable checks run concurrently, so the layer takes as long as
+        the slowest check rather than their sum. Inside a git checkout only
+        files changed against HEAD are checked, and a check whose file type
+        was not touched is skipped.
+        """
+        return self._static_analysis(self._git_changed_files())
+
+    def _static_analysis(self, changed: Optional[frozenset]) -> ValidationResult:
+        """Run Layer 1 against an already computed git change set."""
+        self._changed_files_cache = changed
+
+        # Each entry is either a finished check dict or a callable to run
+        entries: List[Any] = []
+        if self._tsconfig_path.exists():
+            if changed is None or any(p.endswith((".ts", ".tsx")) for p in changed):
+                entries.append(self._check_typescript)
+            else:
+                entries.append({"check": "typescript", "passed": True,
+                                "skipped": "no typescript files changed"})
+        if changed is None:
+            py_files = list(itertools.islice(_iter_py_files(self.project_root), 10))
+        else:
+            py_files = [
+                p for p in sorted(changed)
+                if p.endswith(".py") and os.path.isfile(os.path.join(self._root_str, p))
+            ]
+            if not py_files:
+                entries.append({"check": "python_syntax", "passed": True,
+                                "skipped": "no python files changed"})
+        if py_files:
+            entries.append(functools.partial(self._check_python_syntax, py_files))
+
+        check_fns = [entry for entry in entries if callable(entry)]
+        if check_fns:
+            import concurrent.futures
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(check_fns)) as pool:
+                futures = {fn: pool.submit(fn) for fn in check_fns}
+                entries = [futures[e].result() if callable(e) else e for e in entries]
+        checks = entries
+        # A check that could not run (missing toolchain) is reported but
+        # does not fail the layer
+        passed = all(check["passed"] or "error" in check for check in checks)
 
         result = ValidationResult(
             layer="static_analysis",
@@ -388,26 +871,25 @@ class ValidationLayerStack:
         passed = True
         details = {}
 
-        # Try pytest first
+        import importlib.util
+
+        # Try pytest first, sharded across cores with pytest-xdist (keeping
+        # two cores free) when it is installed; either way pytest runs once.
+        pytest_cmd = ["python3", "-m", "pytest", "-v", "--tb=short"]
+        workers = max(1, (os.cpu_count() or 2) - 2)
+        if workers > 1 and importlib.util.find_spec("xdist") is not None:
+            pytest_cmd += ["-n", str(workers), "--dist=loadfile"]
         try:
-            result = subprocess.run(
-                ["python3", "-m", "pytest", "-v", "--tb=short"],
-                capture_output=True, text=True, timeout=120,
-                cwd=self.project_root
-            )
+            result = _run_with_tail(pytest_cmd, cwd=self.project_root, timeout=120)
             details["framework"] = "pytest"
             details["output"] = result.stdout[-1000:] if result.stdout else ""
             details["errors"] = result.stderr[-500:] if result.stderr else ""
             passed = result.returncode == 0
         except FileNotFoundError:
             # Try npm test
-            if (self.project_root / "package.json").exists():
+            if self._package_json_path.exists():
                 try:
-                    result = subprocess.run(
-                        ["npm", "test"],
-                        capture_output=True, text=True, timeout=120,
-                        cwd=self.project_root
-                    )
+                    result = _run_with_tail(["npm", "test"], cwd=self.project_root, timeout=120)
                     details["framework"] = "npm"
                     details["output"] = result.stdout[-1000:] if result.stdout else ""
                     passed = result.returncode == 0
@@ -438,11 +920,7 @@ class ValidationLayerStack:
 
         if sandbox_cmd:
             try:
-                result = subprocess.run(
-                    sandbox_cmd.split(),
-                    capture_output=True, text=True, timeout=300,
-                    cwd=self.project_root
-                )
+                result = _run_with_tail(sandbox_cmd.split(), cwd=self.project_root, timeout=300)
                 details["output"] = result.stdout[-1000:] if result.stdout else ""
                 passed = result.returncode == 0
             except Exception as e:
@@ -465,37 +943,48 @@ class ValidationLayerStack:
         Layer 4: Behavioral Diff Auditing
         - Summarize functional changes
         - Generate human-readable diff report
+
+        ``shortstat`` matches `git diff --shortstat`; ``diff_stat`` is a
+        simplified per-file listing (see ``_parse_numstat``).
         """
+        import subprocess
+
         details = {}
 
         try:
-            # Get git diff stats
-            result = subprocess.run(
-                ["git", "diff", "--stat", "HEAD~1"],
-                capture_output=True, text=True, timeout=10,
+            # Exit-code-only probe: git stops at the first difference, so the
+            # common "nothing changed" case skips the full stat computation
+            quiet = subprocess.run(
+                ["git", "diff", "--quiet", "HEAD~1"],
+                capture_output=True, timeout=5,
                 cwd=self.project_root
             )
-            details["diff_stat"] = result.stdout if result.returncode == 0 else ""
-
-            # Get changed files
+            if quiet.returncode == 0:
+                details.update({"diff_stat": "", "changed_files": [], "shortstat": ""})
+                return self._record_diff_result(details)
+
+            # Exit code 1 means HEAD~1 exists and differs; any other code is a
+            # git error (typically a single-commit history), so diff against
+            # the empty tree directly instead of retrying. One numstat diff
+            # yields the stat listing, file names and totals.
+            base = "HEAD~1" if quiet.returncode == 1 else _GIT_EMPTY_TREE
             result = subprocess.run(
-                ["git", "diff", "--name-only", "HEAD~1"],
+                ["git", "diff", "--numstat", "-z", "--no-renames", base],
                 capture_output=True, text=True, timeout=10,
                 cwd=self.project_root
             )
-            details["changed_files"] = result.stdout.strip().split("\n") if result.returncode == 0 else []
-
-            # Count additions/deletions
-            result = subprocess.run(
-                ["git", "diff", "--shortstat", "HEAD~1"],
-                capture_output=True, text=True, timeout=10,
-                cwd=self.project_root
-            )
-            details["shortstat"] = result.stdout.strip() if result.returncode == 0 else ""
+            if result.returncode == 0:
+                details.update(_parse_numstat(result.stdout))
+            else:
+                details.update({"diff_stat": "", "changed_files": [], "shortstat": ""})
 
         except Exception as e:
             details["error"] = str(e)
 
+        return self._record_diff_result(details)
+
+    def _record_diff_result(self, details: Dict[str, Any]) -> ValidationResult:
+        """Record the (informational) Layer 4 result."""
         result = ValidationResult(
             layer="behavioral_diff",
             passed=True,  # This layer is informational
@@ -505,25 +994,87 @@ class ValidationLayerStack:
         self.results.append(result)
         return result
 
-    def run_all_layers(self) -> List[ValidationResult]:
-        """Run all validation layers sequentially."""
-        results = []
-        results.append(self.run_layer_1_static_analysis())
-        results.append(self.run_layer_2_unit_tests())
-        results.append(self.run_layer_3_integration_sandbox())
-        results.append(self.run_layer_4_behavioral_diff())
-        return results
+    def _skipped_result(self, layer: str) -> ValidationResult:
+        """Build a failed placeholder result for a layer that was not run."""
+        result = ValidationResult(
+            layer=layer,
+            passed=False,
+            message=f"{layer} skipped due to upstream failure",
+            details={"skipped": True}
+        )
+        self.results.append(result)
+        return result
+
+    def run_all_layers(self, fail_fast: bool = True) -> List[ValidationResult]:
+        """
+        Run all validation layers.
+
+        Layer 4 only reads git state, so it runs in a background thread
+        while the other layers execute, and the independent test layers
+        (2 and 3) run concurrently with each other. With fail_fast, a
+        static analysis failure skips the test layers; without it nothing
+        gates the test layers, so all four layers run at once.
+
+        Results are memoized by working tree fingerprint, so validating an
+        unchanged tree again returns the previous results without running
+        any tools. Runs in which a layer or check could not execute are not
+        cached, and only the most recent _VALIDATION_MEMO_SIZE trees are kept.
+        """
+        changed = self._git_changed_files()
+        fingerprint = self._tree_fingerprint(changed)
+        memo_key = f"{fingerprint}:{fail_fast}" if fingerprint else None
+        cached = self._memo.get(memo_key) if memo_key else None
+        if cached is not None:
+            self._memo.move_to_end(memo_key)
+            self.results.extend(cached)
+            return list(cached)
+
+        import concurrent.futures
+
+        start = len(self.results)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+            diff_future = pool.submit(self.run_layer_4_behavioral_diff)
+
+            if fail_fast:
+                layer_1 = self._static_analysis(changed)
+                run_tests = layer_1.passed
+            else:
+                static_future = pool.submit(self._static_analysis, changed)
+                run_tests = True
+
+            if run_tests:
+                unit_future = pool.submit(self.run_layer_2_unit_tests)
+                sandbox_future = pool.submit(self.run_layer_3_integration_sandbox)
+                layer_2 = unit_future.result()
+                layer_3 = sandbox_future.result()
+            else:
+                layer_2 = self._skipped_result("unit_tests")
+                layer_3 = self._skipped_result("integration_sandbox")
+            if not fail_fast:
+                layer_1 = static_future.result()
+            layer_4 = diff_future.result()
+
+        results = [layer_1, layer_2, layer_3, layer_4]
+        # Keep self.results in layer order regardless of completion order
+        self.results[start:] = results
+        if memo_key and not any(_has_error(r) for r in results):
+            self._memo[memo_key] = results
+            if len(self._memo) > _VALIDATION_MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return list(results)
 
     def get_summary(self) -> Dict[str, Any]:
         """Get validation summary."""
+        passed = 0
+        results = []
+        for r in self.results:
+            passed += r.passed
+            results.append({"layer": r.layer, "passed": r.passed, "message": r.message})
         return {
             "total_layers": len(self.results),
-            "passed": sum(1 for r in self.results if r.passed),
-            "failed": sum(1 for r in self.results if not r.passed),
-            "results": [
-                {"layer": r.layer, "passed": r.passed, "message": r.message}
-                for r in self.results
-            ]
+            "passed": passed,
+            "failed": len(self.results) - passed,
+            "results": results
         }
 
 
@@ -531,6 +1082,148 @@ class ValidationLayerStack:
 # WORKFLOW ENGINE
 # ============================================================================
 
+# Statement text is kept constant so sqlite3's per-connection statement
+# cache reuses the prepared statement instead of re-parsing on every call
+_STATEMENT_CACHE_SIZE = 256
+
+_INSERT_EVENT_SQL = """
+    INSERT INTO workflow_events
+    (workflow_id, event_type, phase, task_id, agent, tokens_in, tokens_out, cost, timestamp, data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Per-workflow event history in time order, and per-task lookups
+_EVENT_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_events_wf_ts ON workflow_events(workflow_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_events_task ON workflow_events(task_id)",
+)
+
+_UPSERT_WORKFLOW_SQL = """
+    INSERT OR REPLACE INTO workflows
+    (id, name, description, status, created_at, completed_at, total_cost, data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPDATE_WORKFLOW_SUMMARY_SQL = """
+    UPDATE workflows SET status = ?, completed_at = ?, total_cost = ?
+    WHERE id = ?
+"""
+
+
+# (epoch second, its local-time ISO prefix); swapped as one tuple so
+# concurrent callers never see a mismatched pair
+_iso_second_cache = (-1, "")
+
+
+def _iso_now() -> str:
+    """``datetime.now().isoformat()``, formatting the datetime once per second."""
+    global _iso_second_cache
+    sec, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_sec, prefix = _iso_second_cache
+    if sec != cached_sec:
+        prefix = datetime.fromtimestamp(sec).isoformat()
+        _iso_second_cache = (sec, prefix)
+    micros = nanos // 1000
+    # isoformat() leaves out a zero microsecond part
+    return f"{prefix}.{micros:06d}" if micros else prefix
+
+
+@contextlib.contextmanager
+def _transaction(conn: "sqlite3.Connection") -> Iterator[None]:
+    """Explicit transaction on an autocommit (isolation_level=None) connection."""
+    conn.execute("BEGIN")
+    try:
+        yield
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _drain_event_rows(rows: deque) -> List[tuple]:
+    # popleft rather than clear() so rows appended concurrently survive
+    return [rows.popleft() for _ in range(len(rows))]
+
+
+def _flush_event_rows(conn: "sqlite3.Connection", rows: deque, lock: threading.Lock):
+    """Write buffered workflow event rows in one transaction."""
+    with lock:
+        if not rows:
+            return
+        batch = _drain_event_rows(rows)
+        try:
+            with _transaction(conn):
+                conn.executemany(_INSERT_EVENT_SQL, batch)
+        except Exception:
+            rows.extendleft(reversed(batch))  # Keep them for the next flush
+            raise
+
+
+class _EventWriter:
+    """Write-behind thread that persists full event batches.
+
+    ``notify`` wakes the thread (started on first use) so the caller of
+    ``record_event`` never waits on the database. A failed batch is put
+    back in the buffer and its error re-raised by the next ``check``.
+    """
+
+    def __init__(self, conn: "sqlite3.Connection", rows: deque, lock: threading.Lock):
+        self._conn = conn
+        self._rows = rows
+        self._lock = lock
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._error: Optional[BaseException] = None
+
+    def notify(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None and not self._stopping:
+                    thread = threading.Thread(
+                        target=self._run, name="workflow-event-writer", daemon=True
+                    )
+                    thread.start()
+                    self._thread = thread
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopping:
+                return
+            try:
+                _flush_event_rows(self._conn, self._rows, self._lock)
+            except Exception as exc:
+                self._error = exc
+
+    def check(self):
+        """Re-raise the last background write error, if any."""
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def stop(self):
+        with self._start_lock:
+            self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def _close_engine_db(
+    conn: "sqlite3.Connection", rows: deque, lock: threading.Lock, writer: _EventWriter
+):
+    """Stop the event writer, flush pending events and close the connection."""
+    try:
+        writer.stop()
+        _flush_event_rows(conn, rows, lock)
+    finally:
+        conn.close()
+
+
 class Workflow:
     """
     Represents a complete TDD workflow with tasks, phases, and checkpoints.
@@ -550,6 +1243,9 @@ class Workflow:
     - Implementation auto-iterates until all tests pass
     """
 
+    _PHASE_ORDER = tuple(WorkflowPhase)
+    _NEXT_PHASE = dict(zip(_PHASE_ORDER, _PHASE_ORDER[1:]))
+
     def __init__(
         self,
         name: str,
@@ -557,18 +1253,39 @@ class Workflow:
         circuit_breaker: CostCircuitBreaker,
         project_root: str = "."
     ):
-        self.id = hashlib.md5(f"{name}{datetime.now().isoformat()}".encode()).hexdigest()[:12]
+        self.created_at = datetime.now()
+        # Formatted once; reused for every save
+        self._created_at_iso = self.created_at.isoformat()
+        # 12 random hex chars, as secrets.token_hex(6) would give
+        self.id = os.urandom(6).hex()
         self.name = name
         self.description = description
         self.tasks: List[Task] = []
         self.checkpoints: List[WorkflowCheckpoint] = []
+        self._checkpoint_by_phase: Dict[WorkflowPhase, WorkflowCheckpoint] = {}
         self.current_phase = WorkflowPhase.SPEC
         self.circuit_breaker = circuit_breaker
         self.validation_stack = ValidationLayerStack(project_root)
-        self.created_at = datetime.now()
         self.started_at: Optional[datetime] = None
         self.completed_at: Optional[datetime] = None
         self._task_counter = 0
+        # Bumped whenever a task is added or a serialized task field changes
+        self._revision = 0
+        self._saved_revision = -1
+        self._todo_cache: List[Dict[str, Any]] = []
+        self._todo_cache_revision = -1
+        self._todo_json = "[]"
+        self._todo_json_revision = -1
+        # (status counts, total tokens, total cost) as of _status_totals_revision
+        self._status_totals: tuple = (Counter(), 0, 0)
+        self._status_totals_revision = 0
+        self._task_by_id: Dict[str, Task] = {}
+        # Pending tasks in scheduling order; None when it must be re-sorted
+        self._pending_cache: Optional[List[Task]] = None
+        # Tasks grouped by phase in WorkflowPhase order; None when stale
+        self._tasks_by_phase: Optional[Dict[WorkflowPhase, List[Task]]] = {
+            phase: [] for phase in WorkflowPhase
+        }
 
     def add_task(
         self,
@@ -588,11 +1305,65 @@ class Workflow:
             phase=phase,
             assigned_agent=assigned_agent,
             dependencies=dependencies or [],
-            priority=priority
+            priority=priority,
+            sequence=self._task_counter
         )
+        _object_setattr(task, "_on_change", self._on_task_changed)
         self.tasks.append(task)
+        self._task_by_id[task.id] = task
+        if self._tasks_by_phase is not None:
+            self._tasks_by_phase[phase].append(task)
+        self._revision += 1
+        self._pending_cache = None
         return task
 
+    def extend_from_template(self, template) -> List[Task]:
+        """Add one task per (content, active_form, phase, agent, priority) row.
+
+        Equivalent to calling add_task for each row, with the bookkeeping
+        done once for the whole batch.
+        """
+        rows = template if isinstance(template, (list, tuple)) else tuple(template)
+        start = self._task_counter
+        buckets = self._tasks_by_phase
+        task_by_id = self._task_by_id
+        on_change = self._on_task_changed
+        # Sized up front so the batch is filled by index, not grown by append
+        added: List[Task] = [None] * len(rows)  # type: ignore[list-item]
+        for offset, (content, active_form, phase, agent, priority) in enumerate(rows):
+            counter = start + offset + 1
+            task = Task(
+                id=f"{self.id}-{counter:03d}",
+                content=content,
+                active_form=active_form,
+                phase=phase,
+                assigned_agent=agent,
+                priority=priority,
+                sequence=counter
+            )
+            _object_setattr(task, "_on_change", on_change)
+            task_by_id[task.id] = task
+            if buckets is not None:
+                buckets[phase].append(task)
+            added[offset] = task
+        self.tasks.extend(added)
+        self._task_counter = start + len(added)
+        if added:
+            self._revision += 1
+            self._pending_cache = None
+        return added
+
+    def _on_task_changed(self, task: Task, field_name: str):
+        self._revision += 1
+        # Tasks leaving PENDING are filtered out lazily; anything that can
+        # add to or reorder the pending list forces a re-sort
+        if field_name == "priority" or (
+            field_name == "status" and task.status == TaskStatus.PENDING
+        ):
+            self._pending_cache = None
+        elif field_name == "phase":
+            self._tasks_by_phase = None  # Old phase unknown; regroup lazily
+
     def add_checkpoint(
         self,
         name: str,
@@ -608,68 +1379,222 @@ class Workflow:
             auto_proceed_conditions=auto_proceed_conditions or []
         )
         self.checkpoints.append(checkpoint)
+        # The first checkpoint registered for a phase wins
+        self._checkpoint_by_phase.setdefault(phase, checkpoint)
         return checkpoint
 
+    def _phase_buckets(self) -> Dict[WorkflowPhase, List[Task]]:
+        """Tasks grouped by phase, regrouped only after a phase reassignment."""
+        buckets = self._tasks_by_phase
+        if buckets is None:
+            buckets = {phase: [] for phase in WorkflowPhase}
+            for task in self.tasks:
+                buckets[task.phase].append(task)
+            self._tasks_by_phase = buckets
+        return buckets
+
     def get_tasks_for_phase(self, phase: WorkflowPhase) -> List[Task]:
         """Get all tasks for a specific phase."""
-        return [t for t in self.tasks if t.phase == phase]
+        return list(self._phase_buckets()[phase])
 
     def get_pending_tasks(self) -> List[Task]:
-        """Get all pending tasks in priority order."""
-        return sorted(
-            [t for t in self.tasks if t.status == TaskStatus.PENDING],
-            key=lambda t: (-t.priority, t.created_at)
-        )
+        """Get all pending tasks in priority order (ties by creation order)."""
+        return list(self._pending_tasks())
+
+    def _pending_tasks(self) -> List[Task]:
+        """The cached pending list itself; callers must not mutate it."""
+        pending = self._pending_cache
+        if pending is None:
+            pending = sorted(
+                [t for t in self.tasks if t.status == TaskStatus.PENDING],
+                key=_TASK_SORT_KEY
+            )
+        else:
+            pending = [t for t in pending if t.status == TaskStatus.PENDING]
+        self._pending_cache = pending
+        return pending
+
+    def _dependencies_met(self, task: Task) -> bool:
+        """True when every dependency is a completed task of this workflow."""
+        task_by_id = self._task_by_id
+        for dep_id in task.dependencies:
+            dep = task_by_id.get(dep_id)
+            if dep is None or dep.status != TaskStatus.COMPLETED:
+                return False
+        return True
 
     def get_next_task(self) -> Optional[Task]:
-        """Get the next task to execute based on dependencies and priority."""
-        pending = self.get_pending_tasks()
-        for task in pending:
-            # Check if all dependencies are completed
-            deps_completed = all(
-                any(t.id == dep_id and t.status == TaskStatus.COMPLETED for t in self.tasks)
-                for dep_id in task.dependencies
-            )
-            if deps_completed:
+        """Get the next task to execute based on dependencies and priority.
+
+        Readiness is checked against current task states rather than a
+        precomputed topological order, so a task blocked on an unfinished
+        dependency never hides a ready one behind it.
+        """
+        dependencies_met = self._dependencies_met
+        for task in self._pending_tasks():
+            if not task.dependencies or dependencies_met(task):
                 return task
         return None
 
     def advance_phase(self) -> WorkflowPhase:
         """Advance to the next workflow phase."""
-        phase_order = list(WorkflowPhase)
-        current_idx = phase_order.index(self.current_phase)
-        if current_idx < len(phase_order) - 1:
-            self.current_phase = phase_order[current_idx + 1]
+        # The final phase has no successor and stays put
+        self.current_phase = self._NEXT_PHASE.get(
+            self.current_phase, self.current_phase
+        )
         return self.current_phase
 
     def get_checkpoint_for_phase(self, phase: WorkflowPhase) -> Optional[WorkflowCheckpoint]:
         """Get checkpoint for a phase if one exists."""
-        for cp in self.checkpoints:
-            if cp.phase == phase:
-                return cp
-        return None
+        return self._checkpoint_by_phase.get(phase)
 
     def to_todo_list(self) -> List[Dict[str, Any]]:
-        """Convert workflow tasks to TodoWrite format."""
-        return [task.to_dict() for task in self.tasks]
+        """Convert workflow tasks to TodoWrite format.
+
+        The list is rebuilt only when the task revision changed, and then
+        only changed tasks rebuild their dicts. The returned list is a fresh
+        copy but the dicts are shared.
+        """
+        if self._todo_cache_revision != self._revision:
+            self._todo_cache = [task.to_dict() for task in self.tasks]
+            self._todo_cache_revision = self._revision
+        return list(self._todo_cache)
+
+    def to_todo_json(self) -> str:
+        """The todo list as ``json.dumps(self.to_todo_list())`` would encode it.
+
+        Built from each task's cached JSON, so only changed tasks are
+        re-encoded, and reused as is until the task revision changes.
+        """
+        if self._todo_json_revision != self._revision:
+            self._todo_json = "[" + ", ".join(task.to_json() for task in self.tasks) + "]"
+            self._todo_json_revision = self._revision
+        return self._todo_json
+
+    def iter_todo_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Yield task dicts in TodoWrite format without building a list."""
+        for task in self.tasks:
+            yield task.to_dict()
 
     def get_status(self) -> Dict[str, Any]:
         """Get workflow status summary."""
+        if self._status_totals_revision != self._revision:
+            status_counts: Counter = Counter()
+            total_tokens = 0
+            total_cost = 0
+            for t in self.tasks:
+                status_counts[t.status] += 1
+                total_tokens += t.tokens_used
+                total_cost += t.cost
+            self._status_totals = (status_counts, total_tokens, total_cost)
+            self._status_totals_revision = self._revision
+        status_counts, total_tokens, total_cost = self._status_totals
         return {
             "id": self.id,
             "name": self.name,
             "current_phase": self.current_phase.name,
             "total_tasks": len(self.tasks),
-            "pending": sum(1 for t in self.tasks if t.status == TaskStatus.PENDING),
-            "in_progress": sum(1 for t in self.tasks if t.status == TaskStatus.IN_PROGRESS),
-            "completed": sum(1 for t in self.tasks if t.status == TaskStatus.COMPLETED),
-            "failed": sum(1 for t in self.tasks if t.status == TaskStatus.FAILED),
-            "total_tokens": sum(t.tokens_used for t in self.tasks),
-            "total_cost": sum(t.cost for t in self.tasks),
+            "pending": status_counts[TaskStatus.PENDING],
+            "in_progress": status_counts[TaskStatus.IN_PROGRESS],
+            "completed": status_counts[TaskStatus.COMPLETED],
+            "failed": status_counts[TaskStatus.FAILED],
+            "total_tokens": total_tokens,
+            "total_cost": total_cost,
             "budget_status": self.circuit_breaker.get_status(),
         }
 
 
+# (content, active_form, phase, assigned_agent) for each task
+# create_workflow_from_task scaffolds, in creation order
+_TDD_TASK_ROWS = (
+    # Phase 1: SPEC - Feature specification and requirements
+    ("Analyze task requirements and define feature scope", "Analyzing requirements",
+     WorkflowPhase.SPEC, "planner"),
+    ("Explore codebase for existing patterns and conventions", "Exploring codebase",
+     WorkflowPhase.SPEC, "researcher"),
+    ("Create detailed product specification document", "Creating specification",
+     WorkflowPhase.SPEC, "planner"),
+    ("Define success criteria and acceptance requirements", "Defining success criteria",
+     WorkflowPhase.SPEC, "planner"),
+
+    # Phase 2: TEST_DESIGN - Design tests that guarantee requirements
+    ("Design unit test cases from specification", "Designing unit tests",
+     WorkflowPhase.TEST_DESIGN, "test-writer"),
+    ("Design integration test cases for system boundaries", "Designing integration tests",
+     WorkflowPhase.TEST_DESIGN, "test-writer"),
+    ("Design edge case and error condition tests", "Designing edge case tests",
+     WorkflowPhase.TEST_DESIGN, "test-writer"),
+    ("Review test design for completeness and correctness", "Reviewing test design",
+     WorkflowPhase.TEST_DESIGN, "critic"),
+
+    # Phase 3: TEST_IMPL - Write tests FIRST (tests become IMMUTABLE)
+    ("Implement unit tests from test design spec", "Implementing unit tests",
+     WorkflowPhase.TEST_IMPL, "test-writer"),
+    ("Implement integration tests from test design spec", "Implementing integration tests",
+     WorkflowPhase.TEST_IMPL, "test-writer"),
+    ("Verify all tests fail (code not yet written)", "Verifying tests fail",
+     WorkflowPhase.TEST_IMPL, "validator"),
+    ("LOCK TESTS: Mark tests as immutable for implementation phase", "Locking tests",
+     WorkflowPhase.TEST_IMPL, "validator"),
+
+    # Phase 4: IMPLEMENT - Write code to pass tests (CANNOT change tests)
+    ("Implement minimum code to pass first test", "Implementing code",
+     WorkflowPhase.IMPLEMENT, "implementer"),
+    ("Iterate implementation until ALL tests pass", "Iterating until tests pass",
+     WorkflowPhase.IMPLEMENT, "implementer"),
+    ("Verify NO TODOs in production code", "Checking for TODOs",
+     WorkflowPhase.IMPLEMENT, "validator"),
+    ("Verify NO mocks in production code", "Checking for mocks",
+     WorkflowPhase.IMPLEMENT, "validator"),
+
+    # Phase 5: VALIDATE - Run full validation stack
+    ("Run static analysis (type check, lint)", "Running static analysis",
+     WorkflowPhase.VALIDATE, "validator"),
+    ("Run complete test suite (must be 100% passing)", "Running test suite",
+     WorkflowPhase.VALIDATE, "validator"),
+    ("Run integration tests in sandbox", "Running integration tests",
+     WorkflowPhase.VALIDATE, "validator"),
+    ("Generate behavioral diff report", "Generating diff report",
+     WorkflowPhase.VALIDATE, "validator"),
+
+    # Phase 6: REVIEW - Critical review and quality assessment
+    ("Critical review of implementation quality", "Reviewing implementation",
+     WorkflowPhase.REVIEW, "critic"),
+    ("Verify implementation matches specification", "Verifying spec compliance",
+     WorkflowPhase.REVIEW, "critic"),
+    ("Synthesize findings and recommendations", "Synthesizing findings",
+     WorkflowPhase.REVIEW, "synthesis"),
+
+    # Phase 7: DELIVER - Final synthesis and delivery
+    ("Generate final implementation summary", "Generating summary",
+     WorkflowPhase.DELIVER, "summarizer"),
+    ("Document any follow-up tasks or known limitations", "Documenting follow-ups",
+     WorkflowPhase.DELIVER, "summarizer"),
+)
+
+
+# SPEC starts at 100 and each later phase 10 lower
+_TDD_PHASE_BASE_PRIORITY = {
+    phase: 100 - 10 * idx for idx, phase in enumerate(WorkflowPhase)
+}
+
+
+def _with_phase_priorities(rows) -> tuple:
+    """Append priorities counting down from each phase's base, in row order."""
+    position: Counter = Counter()
+    template = []
+    for content, active_form, phase, agent in rows:
+        template.append((
+            content, active_form, phase, agent,
+            _TDD_PHASE_BASE_PRIORITY[phase] - position[phase],
+        ))
+        position[phase] += 1
+    return tuple(template)
+
+
+_TDD_TASK_TEMPLATE = _with_phase_priorities(_TDD_TASK_ROWS)
+
+
 class WorkflowEngine:
     """
     Main workflow orchestration engine.
@@ -680,8 +1605,18 @@ class WorkflowEngine:
     3. Verified Incrementalism
     4. Subagent Orchestration
     5. Defense-in-Depth Validation
+
+    Persistence uses one long-lived WAL-mode connection. Workflow events are
+    buffered; each full batch of EVENT_FLUSH_SIZE is written by a background
+    thread so record_event does not wait on disk. Call flush_events() or
+    close() to persist the remainder (close also runs at interpreter exit).
     """
 
+    EVENT_FLUSH_SIZE = 64
+
+    # Database directories already created by this process
+    _ensured_dirs: ClassVar[Set[Path]] = set()
+
     def __init__(
         self,
         budget_limit: float = 1.0,
@@ -692,12 +1627,39 @@ class WorkflowEngine:
         self.project_root = Path(project_root)
         self.db_path = Path(db_path).expanduser()
         self.workflows: Dict[str, Workflow] = {}
+        self._db_lock = threading.Lock()
+        self._pending_events: deque = deque()
         self._init_db()
+        self._event_writer = _EventWriter(self._conn, self._pending_events, self._db_lock)
+        self._finalizer = weakref.finalize(
+            self, _close_engine_db, self._conn, self._pending_events, self._db_lock,
+            self._event_writer
+        )
 
-    def _init_db(self):
-        """Initialize workflow database."""
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        with sqlite3.connect(self.db_path) as conn:
+    def _init_db(self, create_indexes: bool = True):
+        """Open the persistent connection and initialize the schema.
+
+        Pass ``create_indexes=False`` to defer the event indexes until after
+        a bulk load, then call ``create_event_indexes()``.
+        """
+        import sqlite3
+
+        db_dir = self.db_path.parent
+        if db_dir not in WorkflowEngine._ensured_dirs:
+            db_dir.mkdir(parents=True, exist_ok=True)
+            WorkflowEngine._ensured_dirs.add(db_dir)
+        # Autocommit mode: single statements commit on their own and batches
+        # use explicit transactions
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None,
+            cached_statements=_STATEMENT_CACHE_SIZE
+        )
+        conn = self._conn
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # One transaction for the whole schema instead of one per statement
+        with self._db_lock, _transaction(conn):
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS workflows (
                     id TEXT PRIMARY KEY,
@@ -726,7 +1688,31 @@ class WorkflowEngine:
                     FOREIGN KEY (workflow_id) REFERENCES workflows(id)
                 )
             """)
-            conn.commit()
+            if create_indexes:
+                for statement in _EVENT_INDEX_SQL:
+                    conn.execute(statement)
+
+    def create_event_indexes(self):
+        """Create the workflow_events lookup indexes if they are missing.
+
+        Idempotent, so it is safe to call after a deferred bulk load.
+        """
+        with self._db_lock, _transaction(self._conn):
+            for statement in _EVENT_INDEX_SQL:
+                self._conn.execute(statement)
+
+    def flush_events(self):
+        """Write any buffered workflow events to the database.
+
+        Also raises the error of a failed background batch write; its rows
+        were kept and are retried here.
+        """
+        self._event_writer.check()
+        _flush_event_rows(self._conn, self._pending_events, self._db_lock)
+
+    def close(self):
+        """Flush buffered events and close the database connection."""
+        self._finalizer()
 
     def create_workflow(
         self,
@@ -818,229 +1804,49 @@ class WorkflowEngine:
             description=task_description
         )
 
-        # =====================================================================
-        # Phase 1: SPEC - Feature specification and requirements
-        # =====================================================================
-        workflow.add_task(
-            "Analyze task requirements and define feature scope",
-            "Analyzing requirements",
-            phase=WorkflowPhase.SPEC,
-            assigned_agent="planner",
-            priority=100
-        )
-        workflow.add_task(
-            "Explore codebase for existing patterns and conventions",
-            "Exploring codebase",
-            phase=WorkflowPhase.SPEC,
-            assigned_agent="researcher",
-            priority=99
-        )
-        workflow.add_task(
-            "Create detailed product specification document",
-            "Creating specification",
-            phase=WorkflowPhase.SPEC,
-            assigned_agent="planner",
-            priority=98
-        )
-        workflow.add_task(
-            "Define success criteria and acceptance requirements",
-            "Defining success criteria",
-            phase=WorkflowPhase.SPEC,
-            assigned_agent="planner",
-            priority=97
-        )
-
-        # =====================================================================
-        # Phase 2: TEST_DESIGN - Design tests that guarantee requirements
-        # =====================================================================
-        workflow.add_task(
-            "Design unit test cases from specification",
-            "Designing unit tests",
-            phase=WorkflowPhase.TEST_DESIGN,
-            assigned_agent="test-writer",
-            priority=90
-        )
-        workflow.add_task(
-            "Design integration test cases for system boundaries",
-            "Designing integration tests",
-            phase=WorkflowPhase.TEST_DESIGN,
-            assigned_agent="test-writer",
-            priority=89
-        )
-        workflow.add_task(
-            "Design edge case and error condition tests",
-            "Designing edge case tests",
-            phase=WorkflowPhase.TEST_DESIGN,
-            assigned_agent="test-writer",
-            priority=88
-        )
-        workflow.add_task(
-            "Review test design for completeness and correctness",
-            "Reviewing test design",
-            phase=WorkflowPhase.TEST_DESIGN,
-            assigned_agent="critic",
-            priority=87
-        )
-
-        # =====================================================================
-        # Phase 3: TEST_IMPL - Write tests FIRST (tests become IMMUTABLE)
-        # =====================================================================
-        workflow.add_task(
-            "Implement unit tests from test design spec",
-            "Implementing unit tests",
-            phase=WorkflowPhase.TEST_IMPL,
-            assigned_agent="test-writer",
-            priority=80
-        )
-        workflow.add_task(
-            "Implement integration tests from test design spec",
-            "Implementing integration tests",
-            phase=WorkflowPhase.TEST_IMPL,
-            assigned_agent="test-writer",
-            priority=79
-        )
-        workflow.add_task(
-            "Verify all tests fail (code not yet written)",
-            "Verifying tests fail",
-            phase=WorkflowPhase.TEST_IMPL,
-            assigned_agent="validator",
-            priority=78
-        )
-        workflow.add_task(
-            "LOCK TESTS: Mark tests as immutable for implementation phase",
-            "Locking tests",
-            phase=WorkflowPhase.TEST_IMPL,
-            assigned_agent="validator",
-            priority=77
-        )
-
-        # =====================================================================
-        # Phase 4: IMPLEMENT - Write code to pass tests (CANNOT change tests)
-        # =====================================================================
-        workflow.add_task(
-            "Implement minimum code to pass first test",
-            "Implementing code",
-            phase=WorkflowPhase.IMPLEMENT,
-            assigned_agent="implementer",
-            priority=70
-        )
-        workflow.add_task(
-            "Iterate implementation until ALL tests pass",
-            "Iterating until tests pass",
-            phase=WorkflowPhase.IMPLEMENT,
-            assigned_agent="implementer",
-            priority=69
-        )
-        workflow.add_task(
-            "Verify NO TODOs in production code",
-            "Checking for TODOs",
-            phase=WorkflowPhase.IMPLEMENT,
-            assigned_agent="validator",
-            priority=68
-        )
-        workflow.add_task(
-            "Verify NO mocks in production code",
-            "Checking for mocks",
-            phase=WorkflowPhase.IMPLEMENT,
-            assigned_agent="validator",
-            priority=67
-        )
-
-        # =====================================================================
-        # Phase 5: VALIDATE - Run full validation stack
-        # =====================================================================
-        workflow.add_task(
-            "Run static analysis (type check, lint)",
-            "Running static analysis",
-            phase=WorkflowPhase.VALIDATE,
-            assigned_agent="validator",
-            priority=60
-        )
-        workflow.add_task(
-            "Run complete test suite (must be 100% passing)",
-            "Running test suite",
-            phase=WorkflowPhase.VALIDATE,
-            assigned_agent="validator",
-            priority=59
-        )
-        workflow.add_task(
-            "Run integration tests in sandbox",
-            "Running integration tests",
-            phase=WorkflowPhase.VALIDATE,
-            assigned_agent="validator",
-            priority=58
-        )
-        workflow.add_task(
-            "Generate behavioral diff report",
-            "Generating diff report",
-            phase=WorkflowPhase.VALIDATE,
-            assigned_agent="validator",
-            priority=57
-        )
-
-        # =====================================================================
-        # Phase 6: REVIEW - Critical review and quality assessment
-        # =====================================================================
-        workflow.add_task(
-            "Critical review of implementation quality",
-            "Reviewing implementation",
-            phase=WorkflowPhase.REVIEW,
-            assigned_agent="critic",
-            priority=50
-        )
-        workflow.add_task(
-            "Verify implementation matches specification",
-            "Verifying spec compliance",
-            phase=WorkflowPhase.REVIEW,
-            assigned_agent="critic",
-            priority=49
-        )
-        workflow.add_task(
-            "Synthesize findings and recommendations",
-            "Synthesizing findings",
-            phase=WorkflowPhase.REVIEW,
-            assigned_agent="synthesis",
-            priority=48
-        )
-
-        # =====================================================================
-        # Phase 7: DELIVER - Final synthesis and delivery
-        # =====================================================================
-        workflow.add_task(
-            "Generate final implementation summary",
-            "Generating summary",
-            phase=WorkflowPhase.DELIVER,
-            assigned_agent="summarizer",
-            priority=40
-        )
-        workflow.add_task(
-            "Document any follow-up tasks or known limitations",
-            "Documenting follow-ups",
-            phase=WorkflowPhase.DELIVER,
-            assigned_agent="summarizer",
-            priority=39
-        )
+        workflow.extend_from_template(_TDD_TASK_TEMPLATE)
 
+        self._save_workflow(workflow)
         return workflow
 
     def _save_workflow(self, workflow: Workflow):
-        """Persist workflow to database."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO workflows
-                (id, name, description, status, created_at, completed_at, total_cost, data)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                workflow.id,
-                workflow.name,
-                workflow.description,
-                workflow.current_phase.name,
-                workflow.created_at.isoformat(),
-                workflow.completed_at.isoformat() if workflow.completed_at else None,
-                sum(t.cost for t in workflow.tasks),
-                json.dumps(workflow.to_todo_list())
-            ))
-            conn.commit()
+        """Persist workflow to database.
+
+        The task JSON blob is only rewritten when tasks were added or
+        changed since the last save; otherwise just the summary columns
+        are updated. Buffered events are written in the same transaction,
+        so a save commits once and leaves the event log current.
+        """
+        tasks_dirty = workflow._revision != workflow._saved_revision
+        completed_at = workflow.completed_at.isoformat() if workflow.completed_at else None
+        total_cost = sum(t.cost for t in workflow.tasks)
+        with self._db_lock:
+            batch = _drain_event_rows(self._pending_events)
+            try:
+                with _transaction(self._conn):
+                    if batch:
+                        self._conn.executemany(_INSERT_EVENT_SQL, batch)
+                    if tasks_dirty:
+                        self._conn.execute(_UPSERT_WORKFLOW_SQL, (
+                            workflow.id,
+                            workflow.name,
+                            workflow.description,
+                            workflow.current_phase.name,
+                            workflow._created_at_iso,
+                            completed_at,
+                            total_cost,
+                            workflow.to_todo_json()
+                        ))
+                    else:
+                        self._conn.execute(
+                            _UPDATE_WORKFLOW_SUMMARY_SQL,
+                            (workflow.current_phase.name, completed_at, total_cost, workflow.id)
+                        )
+            except Exception:
+                # Rolled back, so keep the events for the next flush or save
+                self._pending_events.extendleft(reversed(batch))
+                raise
+        workflow._saved_revision = workflow._revision
 
     def record_event(
         self,
@@ -1053,30 +1859,28 @@ class WorkflowEngine:
         tokens_out: int = 0,
         data: Optional[Dict] = None
     ):
-        """Record a workflow event."""
-        cost = self.circuit_breaker.record_usage(
-            tokens_in, tokens_out,
-            AGENT_REGISTRY.get(agent, {}).get("tier", AgentTier.SONNET).value if agent else "sonnet"
-        )
+        """Record a workflow event.
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO workflow_events
-                (workflow_id, event_type, phase, task_id, agent, tokens_in, tokens_out, cost, timestamp, data)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                workflow_id,
-                event_type,
-                phase,
-                task_id,
-                agent,
-                tokens_in,
-                tokens_out,
-                cost,
-                datetime.now().isoformat(),
-                json.dumps(data) if data else None
-            ))
-            conn.commit()
+        The event row is buffered and written with the next batch.
+        """
+        # None and unknown agents both miss the map and bill at the default tier
+        tier = _AGENT_TIER_STR.get(agent, _DEFAULT_TIER_STR)
+        cost = self.circuit_breaker.record_usage(tokens_in, tokens_out, tier)
+
+        self._pending_events.append((
+            workflow_id,
+            event_type,
+            phase,
+            task_id,
+            agent,
+            tokens_in,
+            tokens_out,
+            cost,
+            _iso_now(),
+            json.dumps(data) if data else None
+        ))
+        if len(self._pending_events) >= self.EVENT_FLUSH_SIZE:
+            self._event_writer.notify()
 
     def get_agent_for_task(self, task: Task) -> Dict[str, Any]:
         """
@@ -1086,8 +1890,9 @@ class WorkflowEngine:
         - Match task type to agent role
         - Select appropriate tier for cost efficiency
         """
-        if task.assigned_agent and task.assigned_agent in AGENT_REGISTRY:
-            agent_info = AGENT_REGISTRY[task.assigned_agent]
+        registry = get_agent_registry()
+        agent_info = registry.get(task.assigned_agent) if task.assigned_agent else None
+        if agent_info is not None:
             return {
                 "name": task.assigned_agent,
                 "model": agent_info["tier"].value,
@@ -1095,21 +1900,11 @@ class WorkflowEngine:
             }
 
         # Default mapping based on TDD phase
-        phase_defaults = {
-            WorkflowPhase.SPEC: ("planner", AgentTier.OPUS),
-            WorkflowPhase.TEST_DESIGN: ("test-writer", AgentTier.SONNET),  # Upgraded for design
-            WorkflowPhase.TEST_IMPL: ("test-writer", AgentTier.HAIKU),
-            WorkflowPhase.IMPLEMENT: ("implementer", AgentTier.SONNET),
-            WorkflowPhase.VALIDATE: ("validator", AgentTier.HAIKU),
-            WorkflowPhase.REVIEW: ("critic", AgentTier.OPUS),
-            WorkflowPhase.DELIVER: ("summarizer", AgentTier.HAIKU),
-        }
-
-        agent_name, tier = phase_defaults.get(task.phase, ("researcher", AgentTier.SONNET))
+        agent_name, tier = _PHASE_DEFAULT_AGENTS.get(task.phase, _FALLBACK_AGENT)
         return {
             "name": agent_name,
             "model": tier.value,
-            "role": AGENT_REGISTRY.get(agent_name, {}).get("role", "general")
+            "role": registry.get(agent_name, {}).get("role", "general")
         }
 
     def generate_claude_md_governance(self, workflow: Workflow) -> str:
@@ -1118,7 +1913,18 @@ class WorkflowEngine:
 
         Implements Constitutional Constraints with TDD philosophy.
         """
-        return f"""# TDD Workflow Governance: {workflow.name}
+        return "".join(self.iter_claude_md_governance(workflow))
+
+    def iter_claude_md_governance(self, workflow: Workflow) -> Iterator[str]:
+        """Yield the CLAUDE.md governance content in chunks.
+
+        Writing the chunks directly to a file avoids holding the whole
+        document, and a second copy of it, in memory.
+        """
+        mark = dict.fromkeys(WorkflowPhase, '○')
+        mark[workflow.current_phase] = '✓'
+        budget = workflow.circuit_breaker.budget
+        yield f"""# TDD Workflow Governance: {workflow.name}
 
 ## Current Phase: {workflow.current_phase.name}
 
@@ -1143,25 +1949,25 @@ SPEC → TEST_DESIGN → TEST_IMPL → IMPLEMENT → VALIDATE → REVIEW → DEL
 
 ## Phase-Specific Constraints
 
-### SPEC Phase (Current: {'✓' if workflow.current_phase == WorkflowPhase.SPEC else '○'})
+### SPEC Phase (Current: {mark[WorkflowPhase.SPEC]})
 ALWAYS define what the feature does before how
 ALWAYS create a detailed product specification
 ALWAYS define success criteria and acceptance requirements
 ALWAYS get approval before proceeding to test design
 
-### TEST_DESIGN Phase (Current: {'✓' if workflow.current_phase == WorkflowPhase.TEST_DESIGN else '○'})
+### TEST_DESIGN Phase (Current: {mark[WorkflowPhase.TEST_DESIGN]})
 ALWAYS design tests that guarantee requirements from spec
 ALWAYS include unit tests, integration tests, and edge cases
 ALWAYS design tests BEFORE thinking about implementation
 ALWAYS get approval before writing tests
 
-### TEST_IMPL Phase (Current: {'✓' if workflow.current_phase == WorkflowPhase.TEST_IMPL else '○'})
+### TEST_IMPL Phase (Current: {mark[WorkflowPhase.TEST_IMPL]})
 ALWAYS write tests exactly as designed
 ALWAYS verify tests FAIL before implementation (no code yet)
 ALWAYS get approval to LOCK tests before implementation
 ⚠️ AFTER APPROVAL: Tests become IMMUTABLE
 
-### IMPLEMENT Phase (Current: {'✓' if workflow.current_phase == WorkflowPhase.IMPLEMENT else '○'})
+### IMPLEMENT Phase (Current: {mark[WorkflowPhase.IMPLEMENT]})
 ALWAYS write minimum code to pass tests
 ALWAYS iterate until ALL tests pass
 NEVER modify tests - they are LOCKED
@@ -1169,27 +1975,27 @@ NEVER add TODO comments
 NEVER add mocks to production code
 ALWAYS match existing code patterns
 
-### VALIDATE Phase (Current: {'✓' if workflow.current_phase == WorkflowPhase.VALIDATE else '○'})
+### VALIDATE Phase (Current: {mark[WorkflowPhase.VALIDATE]})
 ALWAYS run full test suite (must be 100% passing)
 ALWAYS run static analysis checks
 ALWAYS verify NO TODOs in production code
 ALWAYS verify NO mocks in production code
 ALWAYS generate behavioral diff report
 
-### REVIEW Phase (Current: {'✓' if workflow.current_phase == WorkflowPhase.REVIEW else '○'})
+### REVIEW Phase (Current: {mark[WorkflowPhase.REVIEW]})
 ALWAYS verify implementation matches specification
 ALWAYS check for missed requirements
 ALWAYS synthesize findings and recommendations
 
-### DELIVER Phase (Current: {'✓' if workflow.current_phase == WorkflowPhase.DELIVER else '○'})
+### DELIVER Phase (Current: {mark[WorkflowPhase.DELIVER]})
 ALWAYS generate final summary
 ALWAYS document any known limitations
 
 ## Budget Constraints
 
-Current Budget: ${workflow.circuit_breaker.budget.limit:.2f}
-Spent: ${workflow.circuit_breaker.budget.spent:.4f}
-Remaining: ${workflow.circuit_breaker.budget.remaining:.4f}
+Current Budget: ${budget.limit:.2f}
+Spent: ${budget.spent:.4f}
+Remaining: ${budget.remaining:.4f}
 
 ALWAYS check budget before spawning subagents
 ALWAYS prefer Haiku for routine tasks to conserve budget
@@ -1198,15 +2004,37 @@ ALWAYS escalate to Opus only for strategic decisions
 
 ## Checkpoint Protocol
 
-{chr(10).join(f"- {cp.name} ({cp.phase.name}): {'⚠️ REQUIRES APPROVAL' if cp.requires_approval else 'Auto-proceed if: ' + ', '.join(cp.auto_proceed_conditions)}" for cp in workflow.checkpoints)}
-
-## Task List by Phase
-
-{chr(10).join(f"### {phase.name}" + chr(10) + chr(10).join(f"- [{t.status.value}] {t.content} → {t.assigned_agent or 'unassigned'}" for t in workflow.tasks if t.phase == phase) for phase in WorkflowPhase)}
 """
+        yield "\n".join([
+            f"- {cp.name} ({cp.phase.name}): "
+            + ("⚠️ REQUIRES APPROVAL" if cp.requires_approval
+               else "Auto-proceed if: " + ", ".join(cp.auto_proceed_conditions))
+            for cp in workflow.checkpoints
+        ])
+        yield "\n\n## Task List by Phase\n\n"
+        for idx, (phase, tasks) in enumerate(workflow._phase_buckets().items()):
+            yield ("\n" if idx else "") + f"### {phase.name}\n" + "\n".join([
+                f"- [{t.status.value}] {t.content} → {t.assigned_agent or 'unassigned'}"
+                for t in tasks
+            ])
+        yield "\n"
 
     def generate_orchestrator_prompt(self, workflow: Workflow) -> str:
         """Generate a prompt for the orchestrator to execute the TDD workflow."""
+        current_phase = workflow.current_phase
+        status = workflow.get_status()
+        status_json = _dumps_pretty(status)
+        # The bucket is only read here, so skip get_tasks_for_phase's copy
+        phase_tasks_json = _dumps_pretty(
+            [t.to_dict() for t in workflow._phase_buckets()[current_phase]]
+        )
+        # Same snapshot the workflow status embeds; no second budget read
+        budget_json = _dumps_pretty(status["budget_status"])
+        checkpoints_json = _dumps_pretty([
+            {"name": cp.name, "requires_approval": cp.requires_approval}
+            for cp in workflow.checkpoints if cp.phase == current_phase
+        ])
+
         return f"""# TDD Orchestrator Workflow Execution
 
 You are executing TDD workflow: **{workflow.name}**
@@ -1222,7 +2050,7 @@ You are executing TDD workflow: **{workflow.name}**
 5. **Auto-iterate** - Keep implementing until ALL tests pass
 
 ## Workflow Status
-{json.dumps(workflow.get_status(), indent=2)}
+{status_json}
 
 ## Current Phase: {workflow.current_phase.name}
 
@@ -1234,12 +2062,12 @@ SPEC → TEST_DESIGN → TEST_IMPL → IMPLEMENT → VALIDATE → REVIEW → DEL
 ```
 
 ## Tasks for This Phase
-{json.dumps([t.to_dict() for t in workflow.get_tasks_for_phase(workflow.current_phase)], indent=2)}
+{phase_tasks_json}
 
 ## Execution Instructions
 
 1. **Check Budget First**
-   Current budget status: {json.dumps(workflow.circuit_breaker.get_status(), indent=2)}
+   Current budget status: {budget_json}
 
 2. **Phase-Specific Execution**
 
@@ -1276,7 +2104,7 @@ SPEC → TEST_DESIGN → TEST_IMPL → IMPLEMENT → VALIDATE → REVIEW → DEL
 
 3. **Checkpoint Protocol**
    At phase completion, check for approval requirements:
-   {json.dumps([{"name": cp.name, "requires_approval": cp.requires_approval} for cp in workflow.checkpoints if cp.phase == workflow.current_phase], indent=2)}
+   {checkpoints_json}
 
 4. **Phase Transition**
    After completing all tasks in current phase:
@@ -1388,77 +2216,124 @@ def generate_hook_configuration() -> Dict[str, Any]:
 # CLI INTERFACE
 # ============================================================================
 
-def main():
-    """Command-line interface for workflow engine."""
-    import argparse
-
-    parser = argparse.ArgumentParser(
-        description="Workflow Engine - Multi-Agent Orchestration"
-    )
-    subparsers = parser.add_subparsers(dest="command", help="Commands")
-
-    # Create workflow
+def _add_create_parser(subparsers):
     create_parser = subparsers.add_parser("create", help="Create a new workflow")
     create_parser.add_argument("name", help="Workflow name")
     create_parser.add_argument("--description", "-d", default="", help="Description")
     create_parser.add_argument("--budget", "-b", type=float, default=1.0, help="Budget limit")
 
-    # Create from task
+
+def _add_from_task_parser(subparsers):
     task_parser = subparsers.add_parser("from-task", help="Create workflow from task description")
     task_parser.add_argument("task", help="Task description")
     task_parser.add_argument("--budget", "-b", type=float, default=1.0, help="Budget limit")
 
-    # Status
+
+def _add_status_parser(subparsers):
     status_parser = subparsers.add_parser("status", help="Show workflow status")
     status_parser.add_argument("workflow_id", help="Workflow ID")
 
-    # Generate governance
+
+def _add_governance_parser(subparsers):
     gov_parser = subparsers.add_parser("governance", help="Generate governance files")
     gov_parser.add_argument("workflow_id", help="Workflow ID")
     gov_parser.add_argument("--output", "-o", default="CLAUDE.md", help="Output file")
 
-    # Budget status
+
+def _add_budget_parser(subparsers):
     subparsers.add_parser("budget", help="Show budget status")
 
-    args = parser.parse_args()
 
-    engine = WorkflowEngine()
+# Subcommand name -> parser builder; main() only builds the one being run
+_SUBCOMMAND_PARSERS = {
+    "create": _add_create_parser,
+    "from-task": _add_from_task_parser,
+    "status": _add_status_parser,
+    "governance": _add_governance_parser,
+    "budget": _add_budget_parser,
+}
 
-    if args.command == "create":
-        workflow = engine.create_workflow(args.name, args.description, args.budget)
-        print(f"Created workflow: {workflow.id}")
-        print(f"Name: {workflow.name}")
-        print(f"Budget: ${args.budget:.2f}")
-
-    elif args.command == "from-task":
-        workflow = engine.create_workflow_from_task(args.task)
-        print(f"Created workflow: {workflow.id}")
-        print(f"Tasks created: {len(workflow.tasks)}")
-        print("\nTask breakdown:")
-        for task in workflow.tasks:
-            print(f"  [{task.phase.name}] {task.content}")
-
-    elif args.command == "status":
-        if args.workflow_id in engine.workflows:
-            workflow = engine.workflows[args.workflow_id]
-            print(json.dumps(workflow.get_status(), indent=2))
-        else:
-            print(f"Workflow not found: {args.workflow_id}")
-
-    elif args.command == "governance":
-        if args.workflow_id in engine.workflows:
-            workflow = engine.workflows[args.workflow_id]
-            content = engine.generate_claude_md_governance(workflow)
-            Path(args.output).write_text(content)
-            print(f"Governance written to {args.output}")
-        else:
-            print(f"Workflow not found: {args.workflow_id}")
 
-    elif args.command == "budget":
-        print(json.dumps(engine.circuit_breaker.get_status(), indent=2))
+def _cmd_create(args, engine: WorkflowEngine):
+    workflow = engine.create_workflow(args.name, args.description, args.budget)
+    print(f"Created workflow: {workflow.id}")
+    print(f"Name: {workflow.name}")
+    print(f"Budget: ${args.budget:.2f}")
+
+
+def _cmd_from_task(args, engine: WorkflowEngine):
+    workflow = engine.create_workflow_from_task(args.task)
+    print(f"Created workflow: {workflow.id}")
+    print(f"Tasks created: {len(workflow.tasks)}")
+    print("\nTask breakdown:")
+    for task in workflow.tasks:
+        print(f"  [{task.phase.name}] {task.content}")
+
+
+def _cmd_status(args, engine: WorkflowEngine):
+    workflow = engine.workflows.get(args.workflow_id)
+    if workflow is None:
+        print(f"Workflow not found: {args.workflow_id}")
+        return
+    _print_json(workflow.get_status())
+
+
+def _cmd_governance(args, engine: WorkflowEngine):
+    workflow = engine.workflows.get(args.workflow_id)
+    if workflow is None:
+        print(f"Workflow not found: {args.workflow_id}")
+        return
+    # Binary mode: each chunk is encoded once, with no text-layer translation
+    with open(args.output, "wb") as f:
+        f.writelines(
+            chunk.encode("utf-8") for chunk in engine.iter_claude_md_governance(workflow)
+        )
+    print(f"Governance written to {args.output}")
+
 
+def _cmd_budget(args, engine: WorkflowEngine):
+    _print_json(engine.circuit_breaker.get_status())
+
+
+# Subcommand name -> handler(args, engine)
+_COMMAND_HANDLERS = {
+    "create": _cmd_create,
+    "from-task": _cmd_from_task,
+    "status": _cmd_status,
+    "governance": _cmd_governance,
+    "budget": _cmd_budget,
+}
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line interface for workflow engine."""
+    import argparse
+
+    if argv is None:
+        argv = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(
+        description="Workflow Engine - Multi-Agent Orchestration"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    # Register only the requested subcommand; help and unknown commands
+    # need the full list
+    command = argv[0] if argv else None
+    if command in _SUBCOMMAND_PARSERS:
+        _SUBCOMMAND_PARSERS[command](subparsers)
     else:
+        for add_parser in _SUBCOMMAND_PARSERS.values():
+            add_parser(subparsers)
+
+    args = parser.parse_args(argv)
+
+    if args.command is None:
         parser.print_help()
+        return
+
+    engine = WorkflowEngine()
+    _COMMAND_HANDLERS[args.command](args, engine)
 
 
 if __name__ == "__main__":
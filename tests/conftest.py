@@ -0,0 +1,17 @@
+"""Shared pytest fixtures."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def cli_help_result():
+    """Output of ``cli.py --help``, run once for every test that checks it."""
+    cli_path = Path(__file__).parent.parent / "src" / "cli.py"
+    return subprocess.run(
+        [sys.executable, str(cli_path), "--help"],
+        capture_output=True, text=True
+    )
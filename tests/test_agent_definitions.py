@@ -4,10 +4,14 @@
 Version: 2.6.0
 """
 
+import functools
+import os
 import re
-import pytest
+from collections import Counter
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Any, Dict, List, Optional
+
+import pytest
 
 AGENTS_DIR = Path(__file__).parent.parent / "agents"
 REQUIRED_FIELDS = {"name", "description", "tools", "model", "version", "tier"}
@@ -16,35 +20,67 @@ VALID_TIERS = {0, 1, 2, 3}
 TIER_MODEL_MAP = {0: {"opus"}, 1: {"opus"}, 2: {"sonnet"}, 3: {"haiku"}}
 
 
+_FM_RE = re.compile(r'^---\s*\n(.*?)\n---', re.DOTALL)
+# One "key: value" pair per line; the key is everything before the first colon
+_KV_RE = re.compile(r'^([^:\n]*):(.*)$', re.MULTILINE)
+
+
 def parse_frontmatter(content: str) -> Optional[Dict[str, Any]]:
     """Parse YAML frontmatter from markdown content."""
-    match = re.match(r'^---\s*\n(.*?)\n---', content, re.DOTALL)
+    match = _FM_RE.match(content)
     if not match:
         return None
     frontmatter = {}
-    lines = match.group(1).strip().split('\n')
-    for line in lines:
-        if ":" in line:
-            key, value = line.split(":", 1)
-            key = key.strip()
-            value = value.strip()
-            if value.startswith('"') and value.endswith('"'):
-                value = value[1:-1]
-            elif value.startswith("'") and value.endswith("'"):
-                value = value[1:-1]
-            if key == "tier":
-                try:
-                    value = int(value)
-                except ValueError:
-                    pass
-            frontmatter[key] = value
+    for kv in _KV_RE.finditer(match.group(1)):
+        key = kv.group(1).strip()
+        value = kv.group(2).strip()
+        if value.startswith('"') and value.endswith('"'):
+            value = value[1:-1]
+        elif value.startswith("'") and value.endswith("'"):
+            value = value[1:-1]
+        if key == "tier":
+            try:
+                value = int(value)
+            except ValueError:
+                pass
+        frontmatter[key] = value
     return frontmatter
 
 
+# Frontmatter sits at the top of the file; read the rest only if it is longer
+_FM_HEAD_BYTES = 4096
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_cached(path_str: str, mtime_ns: int) -> Optional[Dict[str, Any]]:
+    with open(path_str, "rb") as f:
+        head = f.read(_FM_HEAD_BYTES)
+        # "replace": the cut may split a multi-byte character after the block
+        fm = parse_frontmatter(head.decode("utf-8", "replace"))
+        if fm is None and len(head) == _FM_HEAD_BYTES:
+            fm = parse_frontmatter((head + f.read()).decode("utf-8"))
+    return fm
+
+
+def parse_agent_file(path: Path) -> Optional[Dict[str, Any]]:
+    """Frontmatter of an agent file, re-read only when the file changes.
+
+    The returned dict is shared between callers; do not modify it.
+    """
+    return _parse_cached(str(path), path.stat().st_mtime_ns)
+
+
 def get_agent_files() -> List[Path]:
     if not AGENTS_DIR.exists():
         return []
-    return list(AGENTS_DIR.glob("*.md"))
+    with os.scandir(AGENTS_DIR) as entries:
+        return [Path(e.path) for e in entries if e.name.endswith(".md") and e.is_file()]
+
+
+@pytest.fixture(scope="module")
+def agent_files():
+    # The directory listing does not change between tests; glob it once
+    return get_agent_files()
 
 
 class TestAgentFilesExist:
@@ -61,20 +97,15 @@ class TestAgentFilesExist:
 
 
 class TestAgentFrontmatter:
-    @pytest.fixture
-    def agent_files(self):
-        return get_agent_files()
 
     def test_all_agents_have_valid_frontmatter(self, agent_files):
         for agent_file in agent_files:
-            content = agent_file.read_text(encoding="utf-8")
-            fm = parse_frontmatter(content)
+            fm = parse_agent_file(agent_file)
             assert fm is not None, f"{agent_file.name}: No valid frontmatter"
 
     def test_all_agents_have_required_fields(self, agent_files):
         for agent_file in agent_files:
-            content = agent_file.read_text(encoding="utf-8")
-            fm = parse_frontmatter(content)
+            fm = parse_agent_file(agent_file)
             if fm is None:
                 pytest.fail(f"{agent_file.name}: Could not parse")
             missing = REQUIRED_FIELDS - set(fm.keys())
@@ -82,8 +113,7 @@ class TestAgentFrontmatter:
 
     def test_all_agents_have_valid_model(self, agent_files):
         for agent_file in agent_files:
-            content = agent_file.read_text(encoding="utf-8")
-            fm = parse_frontmatter(content)
+            fm = parse_agent_file(agent_file)
             if fm is None:
                 continue
             model = fm.get("model", "").lower()
@@ -91,8 +121,7 @@ class TestAgentFrontmatter:
 
     def test_all_agents_have_valid_tier(self, agent_files):
         for agent_file in agent_files:
-            content = agent_file.read_text(encoding="utf-8")
-            fm = parse_frontmatter(content)
+            fm = parse_agent_file(agent_file)
             if fm is None:
                 continue
             tier = fm.get("tier")
@@ -100,8 +129,7 @@ class TestAgentFrontmatter:
 
     def test_tier_model_consistency(self, agent_files):
         for agent_file in agent_files:
-            content = agent_file.read_text(encoding="utf-8")
-            fm = parse_frontmatter(content)
+            fm = parse_agent_file(agent_file)
             if fm is None:
                 continue
             tier = fm.get("tier")
@@ -113,41 +141,33 @@ class TestAgentFrontmatter:
 
     def test_all_agents_have_version(self, agent_files):
         for agent_file in agent_files:
-            content = agent_file.read_text(encoding="utf-8")
-            fm = parse_frontmatter(content)
+            fm = parse_agent_file(agent_file)
             if fm is None:
                 continue
             version = fm.get("version", "")
             assert re.match(r"^\d+\.\d+\.\d+$", str(version)), f"{agent_file.name}: Invalid version"
 
 
+@pytest.fixture(scope="module")
+def model_counts(agent_files):
+    # Agents per lower-cased model, counted once for all tier tests
+    counts = Counter()
+    for a in agent_files:
+        fm = parse_agent_file(a)
+        if fm:
+            counts[fm.get("model", "").lower()] += 1
+    return counts
+
+
 class TestTierDistribution:
-    def test_has_opus_agents(self):
-        agent_files = get_agent_files()
-        opus_count = 0
-        for a in agent_files:
-            fm = parse_frontmatter(a.read_text(encoding="utf-8"))
-            if fm and fm.get("model", "").lower() == "opus":
-                opus_count += 1
-        assert opus_count >= 1, "Should have at least one Opus agent"
-
-    def test_has_sonnet_agents(self):
-        agent_files = get_agent_files()
-        sonnet_count = 0
-        for a in agent_files:
-            fm = parse_frontmatter(a.read_text(encoding="utf-8"))
-            if fm and fm.get("model", "").lower() == "sonnet":
-                sonnet_count += 1
-        assert sonnet_count >= 1, "Should have at least one Sonnet agent"
-
-    def test_has_haiku_agents(self):
-        agent_files = get_agent_files()
-        haiku_count = 0
-        for a in agent_files:
-            fm = parse_frontmatter(a.read_text(encoding="utf-8"))
-            if fm and fm.get("model", "").lower() == "haiku":
-                haiku_count += 1
-        assert haiku_count >= 1, "Should have at least one Haiku agent"
+    def test_has_opus_agents(self, model_counts):
+        assert model_counts["opus"] >= 1, "Should have at least one Opus agent"
+
+    def test_has_sonnet_agents(self, model_counts):
+        assert model_counts["sonnet"] >= 1, "Should have at least one Sonnet agent"
+
+    def test_has_haiku_agents(self, model_counts):
+        assert model_counts["haiku"] >= 1, "Should have at least one Haiku agent"
 
 
 if __name__ == "__main__":
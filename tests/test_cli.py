@@ -9,44 +9,55 @@ Tests critical CLI paths:
 Version: 2.6.0
 """
 
+import sqlite3
 import sys
 import tempfile
-import subprocess
-import pytest
+from argparse import Namespace
+from datetime import datetime
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock, patch
+
+import pytest
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+import cli
+from cli import run_doctor, send_test_event, show_recent_events_from_db, show_status
+
+
 class TestCLIModule:
     """Tests for CLI module imports and basic functionality."""
 
     def test_cli_module_imports(self):
         """CLI module should import without errors."""
-        from cli import main, run_doctor, show_status, send_test_event
+        from cli import main, run_doctor, send_test_event, show_status
         assert main is not None
         assert run_doctor is not None
         assert show_status is not None
         assert send_test_event is not None
 
-    def test_cli_help_output(self):
+    def test_cli_help_output(self, cli_help_result):
         """CLI help should display without errors."""
-        cli_path = Path(__file__).parent.parent / "src" / "cli.py"
-        result = subprocess.run(
-            [sys.executable, str(cli_path), "--help"],
-            capture_output=True, text=True
-        )
+        result = cli_help_result
         assert result.returncode == 0
         assert "Agent Dashboard" in result.stdout
 
+    def test_main_dispatches_subcommand(self):
+        """main() should parse only the requested subcommand and run it."""
+        calls = []
+        with patch.object(cli, "show_logs", lambda args: calls.append(args) or 0):
+            with pytest.raises(SystemExit) as exc:
+                cli.main(["--port", "4300", "logs", "-n", "5"])
+        assert exc.value.code == 0
+        assert calls[0].lines == 5
+        assert calls[0].port == 4300
+
 class TestStatusCommand:
     """Tests for the status command."""
 
     def test_status_when_not_installed(self):
         """Status should handle missing installation gracefully."""
-        from cli import show_status
-        from argparse import Namespace
         args = Namespace(port=4200)
         # Should not raise, returns 0
         result = show_status(args)
@@ -54,8 +65,6 @@ class TestStatusCommand:
 
     def test_status_shows_components(self, capsys):
         """Status should display component information."""
-        from cli import show_status
-        from argparse import Namespace
         args = Namespace(port=4200)
         show_status(args)
         captured = capsys.readouterr()
@@ -67,8 +76,6 @@ class TestTestEventCommand:
 
     def test_event_when_server_unavailable(self, capsys):
         """Test event should handle unavailable server gracefully."""
-        from cli import send_test_event
-        from argparse import Namespace
         # Use a port unlikely to be in use
         args = Namespace(
             port=59999,
@@ -89,8 +96,6 @@ class TestLogsCommand:
 
     def test_logs_with_empty_database(self, capsys, tmp_path):
         """Logs should handle empty database gracefully."""
-        from cli import show_recent_events_from_db
-        import sqlite3
         # Create empty database
         db_path = tmp_path / "test.db"
         with sqlite3.connect(db_path) as conn:
@@ -109,9 +114,6 @@ class TestLogsCommand:
 
     def test_logs_with_populated_database(self, capsys, tmp_path):
         """Logs should display events from populated database."""
-        from cli import show_recent_events_from_db
-        import sqlite3
-        from datetime import datetime
         # Create and populate database
         db_path = tmp_path / "test.db"
         with sqlite3.connect(db_path) as conn:
@@ -138,8 +140,6 @@ class TestDoctorCommand:
 
     def test_doctor_runs_without_error(self, capsys):
         """Doctor should complete without raising exceptions."""
-        from cli import run_doctor
-        from argparse import Namespace
         args = Namespace(port=4200)
         # Should run without error (may return non-zero for issues)
         result = run_doctor(args)
@@ -149,8 +149,6 @@ class TestDoctorCommand:
 
     def test_doctor_checks_python_version(self, capsys):
         """Doctor should check Python version."""
-        from cli import run_doctor
-        from argparse import Namespace
         args = Namespace(port=4200)
         run_doctor(args)
         captured = capsys.readouterr()
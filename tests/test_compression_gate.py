@@ -10,26 +10,26 @@ Tests cover:
 - BudgetAwareAgent wrapper
 """
 
-import sys
 import os
+import sys
+
 import pytest
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from compression_gate import (
+    DEFAULT_BUDGET,
+    TIER_BUDGETS,
+    BudgetAwareAgent,
     CompressionGate,
     GateAction,
     GateDecision,
-    BudgetAwareAgent,
-    TIER_BUDGETS,
-    DEFAULT_BUDGET,
-    get_tier_from_model,
     estimate_compression_ratio,
     format_budget_status,
+    get_tier_from_model,
 )
-from validation import AgentTier, HandoffSchema, Finding, Confidence
-
+from validation import AgentTier, Confidence, Finding, HandoffSchema
 
 # ============================================================================
 # COMPRESSION GATE TESTS
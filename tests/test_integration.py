@@ -10,9 +10,10 @@ import asyncio
 import json
 import socket
 import time
-import pytest
-from pathlib import Path
 from datetime import datetime
+from pathlib import Path
+
+import pytest
 
 
 def find_free_port():
@@ -61,6 +62,62 @@ class TestWebServerBasics:
             assert dashboard.port == port
             assert dashboard.sessions == {}
             assert dashboard.events == []
+            # The rendered page and its ETag are shared by same-port instances
+            other = WebDashboard(db_path=db_path, port=port)
+            assert other._index_bytes is dashboard._index_bytes
+            assert other._index_etag == dashboard._index_etag
+        finally:
+            safe_unlink(Path(db_path))
+
+    def test_legacy_db_gets_epoch_column(self):
+        """Databases without ts_epoch should be migrated and backfilled."""
+        import sqlite3
+        import sys
+        import tempfile
+        sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+        from web_server import WebDashboard
+
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+
+        try:
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("""
+                    CREATE TABLE events (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        timestamp TEXT NOT NULL,
+                        agent_name TEXT NOT NULL,
+                        event_type TEXT NOT NULL,
+                        session_id TEXT NOT NULL,
+                        project TEXT NOT NULL,
+                        model TEXT,
+                        tokens_in INTEGER DEFAULT 0,
+                        tokens_out INTEGER DEFAULT 0,
+                        cost REAL DEFAULT 0.0,
+                        payload TEXT
+                    )
+                """)
+                conn.execute(
+                    "INSERT INTO events (timestamp, agent_name, event_type, session_id, project, tokens_in) "
+                    "VALUES (?, 'a', 'Test', 's1', 'p', 10)",
+                    (datetime.now().isoformat(),)
+                )
+
+            dashboard = WebDashboard(db_path=db_path, port=find_free_port())
+            stats = dashboard._get_stats()
+            assert stats["total_events"] == 1
+            assert stats["total_tokens"] == 10
+
+            # Rows written without ts_epoch (as agent_monitor does) still count
+            with sqlite3.connect(db_path) as conn:
+                conn.execute(
+                    "INSERT INTO events (timestamp, agent_name, event_type, session_id, project, tokens_in) "
+                    "VALUES (?, 'b', 'Test', 's2', 'p', 5)",
+                    (datetime.now().isoformat(),)
+                )
+            stats = dashboard._get_stats()
+            assert stats["total_events"] == 2
+            assert stats["total_tokens"] == 15
         finally:
             safe_unlink(Path(db_path))
 
@@ -80,10 +137,11 @@ class TestWebServerAsync:
         import tempfile
         sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-        from web_server import WebDashboard
         import aiohttp
         from aiohttp import web
 
+        from web_server import WebDashboard
+
         with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
             db_path = f.name
 
@@ -107,6 +165,46 @@ class TestWebServerAsync:
         finally:
             safe_unlink(Path(db_path))
 
+    @pytest.mark.asyncio
+    async def test_index_etag(self, free_port):
+        """Index should carry an ETag and honour If-None-Match."""
+        import sys
+        import tempfile
+        sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+        import aiohttp
+        from aiohttp import web
+
+        from web_server import WebDashboard
+
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+
+        try:
+            dashboard = WebDashboard(db_path=db_path, port=free_port)
+            app = dashboard.create_app()
+
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, 'localhost', free_port)
+            await site.start()
+
+            try:
+                async with aiohttp.ClientSession() as session:
+                    url = f"http://localhost:{free_port}/"
+                    async with session.get(url) as resp:
+                        assert resp.status == 200
+                        assert resp.content_type == "text/html"
+                        etag = resp.headers["ETag"]
+                        assert "<!DOCTYPE html>" in await resp.text()
+
+                    async with session.get(url, headers={"If-None-Match": etag}) as resp:
+                        assert resp.status == 304
+            finally:
+                await runner.cleanup()
+        finally:
+            safe_unlink(Path(db_path))
+
     @pytest.mark.asyncio
     async def test_event_submission(self, free_port):
         """Events should be accepted and stored."""
@@ -114,10 +212,11 @@ class TestWebServerAsync:
         import tempfile
         sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-        from web_server import WebDashboard
         import aiohttp
         from aiohttp import web
 
+        from web_server import WebDashboard
+
         with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
             db_path = f.name
 
@@ -160,6 +259,220 @@ class TestWebServerAsync:
         finally:
             safe_unlink(Path(db_path))
 
+    @pytest.mark.asyncio
+    async def test_events_persisted_in_batches(self, free_port):
+        """Queued events should be written to SQLite by shutdown."""
+        import sqlite3
+        import sys
+        import tempfile
+        sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+        import aiohttp
+        from aiohttp import web
+
+        from web_server import WebDashboard
+
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+
+        try:
+            dashboard = WebDashboard(db_path=db_path, port=free_port)
+            app = dashboard.create_app()
+
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, 'localhost', free_port)
+            await site.start()
+
+            try:
+                async with aiohttp.ClientSession() as session:
+                    for i in range(5):
+                        async with session.post(
+                            f"http://localhost:{free_port}/events",
+                            json={"event_type": "Test", "session_id": f"s{i}"}
+                        ) as resp:
+                            assert resp.status == 200
+            finally:
+                await runner.cleanup()
+
+            with sqlite3.connect(db_path) as conn:
+                count = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            assert count == 5
+        finally:
+            safe_unlink(Path(db_path))
+
+    @pytest.mark.asyncio
+    async def test_db_writer_survives_unexpected_errors(self, free_port, capsys):
+        """A failed batch should be logged without stopping the writer."""
+        import sqlite3
+        import sys
+        import tempfile
+        sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+        from web_server import WebDashboard
+
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+
+        try:
+            dashboard = WebDashboard(db_path=db_path, port=free_port)
+            flush_batch = dashboard._flush_batch
+            failures = [RuntimeError("writer broke")]
+
+            def flaky_flush(rows):
+                if failures:
+                    raise failures.pop()
+                flush_batch(rows)
+
+            dashboard._flush_batch = flaky_flush
+            await dashboard._start_db_writer(None)
+            executor = dashboard._db_executor
+            row = (datetime.now().isoformat(), "a", "Test", "s", "p", "sonnet",
+                   0, 0, 0.0, "{}", None)
+            dashboard._write_queue.put_nowait(row)
+            await asyncio.sleep(0.2)
+            dashboard._write_queue.put_nowait(row)
+            await dashboard._stop_db_writer(None)
+
+            assert "writer broke" in capsys.readouterr().out
+            assert dashboard._db_executor is None
+            assert executor._shutdown
+            with sqlite3.connect(db_path) as conn:
+                count = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            assert count == 1
+        finally:
+            safe_unlink(Path(db_path))
+
+    @pytest.mark.asyncio
+    async def test_events_limit_and_since(self, free_port):
+        """Events endpoint should clamp limit and filter by since."""
+        import sys
+        import tempfile
+        sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+        import aiohttp
+        from aiohttp import web
+
+        from web_server import MAX_EVENTS_LIMIT, WebDashboard
+
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+
+        try:
+            dashboard = WebDashboard(db_path=db_path, port=free_port)
+            dashboard.events = [
+                {"timestamp": f"2025-01-01T00:00:{i:02d}", "event_type": "Test"}
+                for i in range(59, -1, -1)
+            ]
+            # Arrived late, and with sub-second precision
+            dashboard.events.append(
+                {"timestamp": "2025-01-01T00:00:55.500000", "event_type": "Late"}
+            )
+            app = dashboard.create_app()
+
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, 'localhost', free_port)
+            await site.start()
+
+            try:
+                base = f"http://localhost:{free_port}/api/events"
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(f"{base}?limit=1000000") as resp:
+                        data = await resp.json()
+                        assert len(data["events"]) == min(61, MAX_EVENTS_LIMIT)
+
+                    async with session.get(f"{base}?limit=0") as resp:
+                        data = await resp.json()
+                        assert len(data["events"]) == 1
+
+                    async with session.get(
+                        f"{base}?since=2025-01-01T00:00:55"
+                    ) as resp:
+                        data = await resp.json()
+                        timestamps = [e["timestamp"] for e in data["events"]]
+                        assert timestamps == [
+                            f"2025-01-01T00:00:{i}" for i in (59, 58, 57, 56)
+                        ] + ["2025-01-01T00:00:55.500000"]
+
+                    async with session.get(f"{base}?since=yesterday") as resp:
+                        assert resp.status == 400
+
+                    async with session.get(f"{base}?limit=abc") as resp:
+                        assert resp.status == 400
+            finally:
+                await runner.cleanup()
+        finally:
+            safe_unlink(Path(db_path))
+
+    @pytest.mark.asyncio
+    async def test_broadcast_drops_oldest_when_queue_full(self, free_port):
+        """A full client queue should discard its oldest message."""
+        import sys
+        import tempfile
+        sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+        from web_server import WebDashboard
+
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+
+        try:
+            dashboard = WebDashboard(db_path=db_path, port=free_port)
+            queue = asyncio.Queue(maxsize=2)
+            dashboard.ws_clients = {object(): queue}
+
+            for i in range(3):
+                await dashboard.broadcast({"n": i})
+
+            assert [json.loads(queue.get_nowait())["n"] for _ in range(2)] == [1, 2]
+        finally:
+            safe_unlink(Path(db_path))
+
+    @pytest.mark.asyncio
+    async def test_websocket_receives_init_and_events(self, free_port):
+        """WebSocket clients should get init data followed by broadcasts."""
+        import sys
+        import tempfile
+        sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+        import aiohttp
+        from aiohttp import web
+
+        from web_server import WebDashboard
+
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+
+        try:
+            dashboard = WebDashboard(db_path=db_path, port=free_port)
+            app = dashboard.create_app()
+
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, 'localhost', free_port)
+            await site.start()
+
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(f"http://localhost:{free_port}/ws") as ws:
+                        init = await ws.receive_json(timeout=5)
+                        assert init["type"] == "init"
+
+                        async with session.post(
+                            f"http://localhost:{free_port}/events",
+                            json={"event_type": "Test"}
+                        ) as resp:
+                            assert resp.status == 200
+
+                        message = await ws.receive_json(timeout=5)
+                        assert message["type"] == "event"
+                        assert message["event"]["event_type"] == "Test"
+            finally:
+                await runner.cleanup()
+        finally:
+            safe_unlink(Path(db_path))
+
     @pytest.mark.asyncio
     async def test_sessions_endpoint(self, free_port):
         """Sessions endpoint should return session data."""
@@ -167,10 +480,11 @@ class TestWebServerAsync:
         import tempfile
         sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-        from web_server import WebDashboard
         import aiohttp
         from aiohttp import web
 
+        from web_server import WebDashboard
+
         with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
             db_path = f.name
 
@@ -201,10 +515,11 @@ class TestWebServerAsync:
         import tempfile
         sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-        from web_server import WebDashboard
         import aiohttp
         from aiohttp import web
 
+        from web_server import WebDashboard
+
         with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
             db_path = f.name
 
@@ -244,14 +559,9 @@ class TestCLI:
         assert run_doctor is not None
         assert show_status is not None
 
-    def test_cli_help(self):
+    def test_cli_help(self, cli_help_result):
         """CLI should display help without errors."""
-        import subprocess
-        result = subprocess.run(
-            ["python", str(Path(__file__).parent.parent / "src" / "cli.py"), "--help"],
-            capture_output=True,
-            text=True
-        )
+        result = cli_help_result
         assert result.returncode == 0
         assert "Agent Dashboard" in result.stdout
 
@@ -263,7 +573,7 @@ class TestHooks:
         """send_event module should import without errors."""
         import sys
         sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
-        from send_event import send_event, estimate_tokens, estimate_cost
+        from send_event import estimate_cost, estimate_tokens, send_event
         assert send_event is not None
         assert estimate_tokens is not None
         assert estimate_cost is not None
@@ -298,7 +608,7 @@ class TestWorkflowEngine:
         """Workflow engine should import without errors."""
         import sys
         sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-        from workflow_engine import WorkflowEngine, WorkflowPhase, TaskStatus
+        from workflow_engine import TaskStatus, WorkflowEngine, WorkflowPhase
         assert WorkflowEngine is not None
         assert WorkflowPhase is not None
         assert TaskStatus is not None
@@ -10,30 +10,30 @@ Tests cover:
 - Audit logging
 """
 
-import sys
 import os
-import pytest
+import sys
 import tempfile
 
+import pytest
+
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from panel_selector import (
-    PanelSizeSelector,
-    TaskMetadata,
-    ScoreBreakdown,
-    PanelSelection,
-    MetadataInferrer,
-    PANEL_THRESHOLDS,
     PANEL_3_JUDGES,
     PANEL_5_JUDGES,
     PANEL_7_JUDGES,
+    PANEL_THRESHOLDS,
+    MetadataInferrer,
+    PanelSelection,
+    PanelSizeSelector,
+    ScoreBreakdown,
+    TaskMetadata,
+    format_panel_selection,
     get_judges_for_panel,
     quick_select_panel,
-    format_panel_selection,
 )
 
-
 # ============================================================================
 # TASK METADATA TESTS
 # ============================================================================
@@ -192,6 +192,28 @@ class TestPanelSizeSelection:
         assert result.score_breakdown is not None
         assert result.score_breakdown.total == result.score
 
+    def test_custom_thresholds_any_order(self):
+        """Test custom thresholds are matched highest first."""
+        selector = PanelSizeSelector(thresholds=[(0, 3), (10, 7), (5, 5)])
+
+        assert selector.score_to_panel_size(12) == 7
+        assert selector.score_to_panel_size(6) == 5
+        assert selector.score_to_panel_size(1) == 3
+
+        selector.thresholds = [(2, 7), (0, 3)]
+        assert selector.score_to_panel_size(3) == 7
+
+    def test_thresholds_immutable(self):
+        """Test thresholds cannot drift from the sorted copy in place."""
+        selector = PanelSizeSelector(thresholds=[(0, 3), (5, 5)])
+
+        assert selector.thresholds == ((0, 3), (5, 5))
+        with pytest.raises(AttributeError):
+            selector.thresholds.append((10, 7))
+
+        selector.thresholds = selector.thresholds + ((10, 7),)
+        assert selector.score_to_panel_size(12) == 7
+
 
 # ============================================================================
 # OVERRIDE TESTS
@@ -10,21 +10,22 @@ Tests cover:
 - Batch operations
 """
 
-import pytest
-import sys
 import os
+import sys
+
+import pytest
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.token_counter import (
+    TokenizerTier,
+    _count_with_characters,
     count_tokens,
     count_tokens_batch,
     estimate_cost,
-    get_tokenizer_info,
     get_all_tokenizers_status,
-    TokenizerTier,
-    _count_with_characters,
+    get_tokenizer_info,
 )
 
 
@@ -206,6 +207,38 @@ class TestTokenizerFallback:
         result = _count_with_characters("Hi")
         assert result >= 0  # max(1, 2//4) = max(1, 0) = 1... actually 0 due to max(1, 0) = 1
 
+    def test_tiktoken_loaded_once(self):
+        """Test the tiktoken tier is loaded lazily and only once."""
+        import src.token_counter as token_counter
+        available = token_counter._load_tiktoken()
+        assert token_counter._tiktoken_loaded is True
+        assert available == (token_counter._tiktoken_encoding is not None)
+        assert available or token_counter._tiktoken_error
+        assert token_counter._load_tiktoken() is available
+
+
+    def test_tiktoken_long_text_batched(self, monkeypatch):
+        """Test long texts are split into windows and encoded as a batch."""
+        import src.token_counter as token_counter
+
+        class FakeEncoding:
+            def encode_ordinary(self, text):
+                return text.split()
+
+            def encode_ordinary_batch(self, texts):
+                self.batch_sizes = [len(t) for t in texts]
+                return [t.split() for t in texts]
+
+        fake = FakeEncoding()
+        monkeypatch.setattr(token_counter, "_tiktoken_encoding", fake)
+        monkeypatch.setattr(token_counter, "_TIKTOKEN_WINDOW_CHARS", 20)
+
+        assert token_counter._count_with_tiktoken("one two") == 2
+        text = "alpha beta gamma\n" * 5
+        assert token_counter._count_with_tiktoken(text) == 15
+        assert max(fake.batch_sizes) <= 20
+        assert "".join(token_counter._split_windows(text, 20)) == text
+
 
 class TestBackwardCompatibility:
     """Tests for backward compatibility."""
@@ -10,29 +10,42 @@ Tests cover:
 - Governance Generation
 """
 
-import sys
 import os
-import pytest
+import shutil
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+import pytest
+
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from workflow_engine import (
-    WorkflowEngine,
-    Workflow,
-    Task,
+    AGENT_REGISTRY,
+    MODEL_PRICING,
+    AgentTier,
     CostCircuitBreaker,
+    Task,
+    TaskStatus,
     ValidationLayerStack,
+    Workflow,
+    WorkflowEngine,
     WorkflowPhase,
-    TaskStatus,
-    AgentTier,
-    MODEL_PRICING,
-    AGENT_REGISTRY,
 )
 
 
+def _init_git_repo(path):
+    """Create a git repository at path with its current files committed."""
+    import subprocess
+    for args in (["init", "-q"], ["add", "."], ["commit", "-q", "-m", "initial"]):
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+            cwd=path, check=True, capture_output=True
+        )
+
+
 # ============================================================================
 # COST CIRCUIT BREAKER TESTS
 # ============================================================================
@@ -64,6 +77,33 @@ class TestCostCircuitBreaker:
         # Should be approximately 11/4 = 2-3 tokens (or more with tiktoken)
         assert tokens >= 2
 
+    def test_token_estimation_tiny_text(self):
+        """Test tiny strings are estimated without the tokenizer cache."""
+        from workflow_engine import _cached_token_count
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        misses_before = _cached_token_count.cache_info().misses
+        assert cb.estimate_tokens("planner") == 2
+        assert cb.estimate_tokens("a") == 1
+        assert _cached_token_count.cache_info().misses == misses_before
+
+    def test_token_estimation_cached(self):
+        """Test repeated prompts are served from the token cache."""
+        from workflow_engine import _cached_token_count
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        text = "Repeated orchestrator prompt for caching"
+        first = cb.estimate_tokens(text)
+        hits_before = _cached_token_count.cache_info().hits
+        assert cb.estimate_tokens(text) == first
+        assert _cached_token_count.cache_info().hits == hits_before + 1
+
+    def test_token_estimation_long_text_not_cached(self):
+        """Test texts over the cache cap are counted without being retained."""
+        from workflow_engine import _TOKEN_CACHE_MAX_CHARS, _cached_token_count
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        size_before = _cached_token_count.cache_info().currsize
+        assert cb.estimate_tokens("x" * (_TOKEN_CACHE_MAX_CHARS + 1)) > 0
+        assert _cached_token_count.cache_info().currsize == size_before
+
     def test_cost_estimation_sonnet(self):
         """Test cost estimation for Sonnet model."""
         cb = CostCircuitBreaker(budget_limit=1.0)
@@ -88,6 +128,23 @@ class TestCostCircuitBreaker:
         cost = cb.estimate_cost(1_000_000, 0, "haiku")
         assert cost == pytest.approx(0.25, rel=0.01)
 
+    def test_cost_estimation_model_ids(self):
+        """Test full model identifiers resolve to their tier pricing."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        assert cb.estimate_cost(1_000_000, 0, "claude-3-5-sonnet") == pytest.approx(3.0)
+        assert cb.estimate_cost(1_000_000, 0, "Claude-Opus-4-20250514") == pytest.approx(15.0)
+        assert cb.estimate_cost(1_000_000, 0, "claude-3-haiku-20240307") == pytest.approx(0.25)
+        assert cb.estimate_cost(1_000_000, 0, "unknown-model") == pytest.approx(3.0)
+
+    def test_cost_estimation_memoizes_unlisted_models(self):
+        """Test unlisted model names are classified once per spelling."""
+        from workflow_engine import _resolve_model_pricing
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        cb.estimate_cost(1000, 0, "Claude-Opus-Next")
+        hits_before = _resolve_model_pricing.cache_info().hits
+        assert cb.estimate_cost(1_000_000, 0, "Claude-Opus-Next") == pytest.approx(15.0)
+        assert _resolve_model_pricing.cache_info().hits == hits_before + 1
+
     def test_budget_check_within_limit(self):
         """Test budget check when within limit."""
         cb = CostCircuitBreaker(budget_limit=1.0)
@@ -95,6 +152,24 @@ class TestCostCircuitBreaker:
         assert allowed is True
         assert "OK" in msg or "WARNING" in msg
 
+    def test_budget_warnings_skip_thresholds(self):
+        """Test a jump past several thresholds counts each of them once."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        allowed, msg = cb.check_budget(0.95)
+        assert allowed is True
+        assert msg.startswith("WARNING")
+        assert cb.budget.warnings_issued == len(cb.WARNING_THRESHOLDS)
+
+        allowed, msg = cb.check_budget(0.95)
+        assert msg == "OK"
+
+    def test_budget_warning_at_exact_threshold(self):
+        """Test reaching a threshold exactly issues its warning."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        assert cb.check_budget(0.49)[1] == "OK"
+        assert cb.check_budget(0.5)[1].startswith("WARNING")
+        assert cb.budget.warnings_issued == 1
+
     def test_budget_check_exceeds_limit(self):
         """Test budget check when exceeding limit."""
         cb = CostCircuitBreaker(budget_limit=0.10)
@@ -170,6 +245,20 @@ class TestTask:
         assert task.status == TaskStatus.PENDING
         assert task.phase == WorkflowPhase.SPEC
 
+    def test_dataclass_helpers_on_attached_task(self):
+        """Test fields(), asdict() and replace() see only the public fields."""
+        import dataclasses
+        workflow = Workflow("Fields", "Test", circuit_breaker=CostCircuitBreaker(1.0))
+        task = workflow.add_task("Write spec", "Writing spec", priority=3)
+
+        names = {f.name for f in dataclasses.fields(task)}
+        assert not names & {"_on_change", "_cached_dict", "_cached_json", "_sort_key"}
+        assert dataclasses.asdict(task)["content"] == "Write spec"
+
+        copy = dataclasses.replace(task, priority=5)
+        assert copy._on_change is None
+        assert copy._sort_key == (-5, task.sequence)
+
     def test_task_to_dict(self):
         """Test task serialization to dict."""
         task = Task(
@@ -203,6 +292,82 @@ class TestTask:
         task.status = TaskStatus.COMPLETED
         assert task.status == TaskStatus.COMPLETED
 
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need 3.10")
+    def test_dataclasses_use_slots(self):
+        """Test hot dataclasses carry no per-instance __dict__."""
+        task = Task(id="test-001", content="Test task", active_form="Testing task")
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        assert not hasattr(task, "__dict__")
+        assert not hasattr(cb.budget, "__dict__")
+        assert cb.budget.remaining == 1.0
+
+    def test_todo_json_matches_todo_list(self):
+        """Test the cached todo JSON tracks task changes."""
+        import json
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        workflow = Workflow(
+            name="Test Workflow",
+            description="Test",
+            circuit_breaker=cb
+        )
+
+        assert workflow.to_todo_json() == "[]"
+        task = workflow.add_task("Task → ü", "Doing task", dependencies=["x"])
+        workflow.add_task("Other", "Doing other")
+        assert workflow.to_todo_json() == json.dumps(workflow.to_todo_list())
+
+        other_json = workflow.tasks[1].to_json()
+        task.status = TaskStatus.COMPLETED
+        encoded = workflow.to_todo_json()
+        assert encoded == json.dumps(workflow.to_todo_list())
+        assert json.loads(encoded)[0]["status"] == "completed"
+        assert workflow.tasks[1].to_json() is other_json
+
+    def test_task_init_skips_change_tracking(self, monkeypatch):
+        """Test construction does not run the per-assignment change hook."""
+        import copy
+
+        import workflow_engine
+
+        class CountingFields(frozenset):
+            lookups = 0
+
+            def __contains__(self, name):
+                CountingFields.lookups += 1
+                return frozenset.__contains__(self, name)
+
+        monkeypatch.setattr(
+            workflow_engine, "_TASK_SERIALIZED_FIELDS",
+            CountingFields(workflow_engine._TASK_SERIALIZED_FIELDS)
+        )
+        task = Task(id="t", content="c", active_form="a", priority=2, sequence=7)
+        assert CountingFields.lookups == 0
+        assert task._sort_key == (-2, 7)
+        assert task._on_change is None
+
+        task.priority = 5
+        assert CountingFields.lookups == 1
+        assert task._sort_key == (-5, 7)
+        assert copy.copy(task).to_dict() == task.to_dict()
+
+    def test_task_to_dict_cached(self):
+        """Test to_dict is reused until a serialized field changes."""
+        task = Task(
+            id="test-001",
+            content="Test task",
+            active_form="Testing task"
+        )
+
+        d = task.to_dict()
+        assert task.to_dict() is d
+
+        task.result = "done"  # Not serialized
+        assert task.to_dict() is d
+
+        task.tokens_used += 100
+        assert task.to_dict() is not d
+        assert task.to_dict()["tokens_used"] == 100
+
 
 # ============================================================================
 # WORKFLOW TESTS
@@ -246,6 +411,43 @@ class TestWorkflow:
         assert task.assigned_agent == "planner"
         assert task.id.startswith(workflow.id)
 
+    def test_workflow_ids_unique(self):
+        """Test workflows with the same name get distinct ids."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        ids = {Workflow("Same", "Test", circuit_breaker=cb).id for _ in range(20)}
+        assert len(ids) == 20
+        assert all(len(wid) == 12 for wid in ids)
+
+    def test_extend_from_template(self):
+        """Test template rows become tasks just like add_task calls."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        workflow = Workflow(
+            name="Test Workflow",
+            description="Test",
+            circuit_breaker=cb
+        )
+        first = workflow.add_task("First", "Doing first")
+
+        added = workflow.extend_from_template([
+            ("Spec", "Writing spec", WorkflowPhase.SPEC, "planner", 5),
+            ("Code", "Writing code", WorkflowPhase.IMPLEMENT, "implementer", 1),
+        ])
+
+        assert workflow.tasks == [first] + added
+        assert added[0].id == f"{workflow.id}-002"
+        assert added[1].assigned_agent == "implementer"
+        assert workflow.get_tasks_for_phase(WorkflowPhase.IMPLEMENT) == [added[1]]
+        assert workflow.get_next_task() is added[0]
+        assert workflow.add_task("Last", "Doing last").id == f"{workflow.id}-004"
+
+        added[0].status = TaskStatus.COMPLETED
+        assert workflow.get_status()["completed"] == 1
+
+        rows = (("Review", "Reviewing", WorkflowPhase.REVIEW, "critic", 0),)
+        (review,) = workflow.extend_from_template(iter(rows))
+        assert review.id == f"{workflow.id}-005"
+        assert workflow.tasks[-1] is review
+
     def test_add_checkpoint(self):
         """Test adding checkpoints to workflow."""
         cb = CostCircuitBreaker(budget_limit=1.0)
@@ -265,6 +467,21 @@ class TestWorkflow:
         assert cp.name == "Spec Review"
         assert cp.requires_approval is True
 
+    def test_get_checkpoint_for_phase(self):
+        """Test checkpoint lookup keeps the first checkpoint of a phase."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        workflow = Workflow(
+            name="Test Workflow",
+            description="Test",
+            circuit_breaker=cb
+        )
+
+        first = workflow.add_checkpoint("Spec Review", WorkflowPhase.SPEC)
+        workflow.add_checkpoint("Spec Sign-off", WorkflowPhase.SPEC)
+
+        assert workflow.get_checkpoint_for_phase(WorkflowPhase.SPEC) is first
+        assert workflow.get_checkpoint_for_phase(WorkflowPhase.VALIDATE) is None
+
     def test_get_tasks_for_phase(self):
         """Test getting tasks by phase."""
         cb = CostCircuitBreaker(budget_limit=1.0)
@@ -307,6 +524,93 @@ class TestWorkflow:
         next_task = workflow.get_next_task()
         assert next_task.id == task2.id
 
+    def test_get_next_task_skips_blocked_tasks(self):
+        """Test a ready task is returned while a higher-priority one waits."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        workflow = Workflow(
+            name="Test Workflow",
+            description="Test",
+            circuit_breaker=cb
+        )
+
+        running = workflow.add_task("Running", "Running", priority=5)
+        blocked = workflow.add_task(
+            "Blocked", "Blocked", priority=10, dependencies=[running.id]
+        )
+        ready = workflow.add_task("Ready", "Ready", priority=1)
+        running.status = TaskStatus.IN_PROGRESS
+
+        assert workflow.get_next_task() is ready
+        running.status = TaskStatus.COMPLETED
+        assert workflow.get_next_task() is blocked
+        assert workflow.get_pending_tasks() == [blocked, ready]
+
+    def test_status_totals_track_task_changes(self):
+        """Test cached status totals follow task updates."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        workflow = Workflow(
+            name="Test Workflow",
+            description="Test",
+            circuit_breaker=cb
+        )
+
+        assert workflow.get_status()["total_tasks"] == 0
+        task = workflow.add_task("Task", "Doing task")
+        other = workflow.add_task("Other", "Doing other")
+        status = workflow.get_status()
+        assert status["pending"] == 2
+        assert status["total_tokens"] == 0
+
+        task.status = TaskStatus.COMPLETED
+        task.tokens_used += 100
+        other.cost = 0.25
+        status = workflow.get_status()
+        assert status["pending"] == 1
+        assert status["completed"] == 1
+        assert status["total_tokens"] == 100
+        assert status["total_cost"] == pytest.approx(0.25)
+
+    def test_tasks_for_phase_after_reassignment(self):
+        """Test phase buckets follow a task moved to another phase."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        workflow = Workflow(
+            name="Test Workflow",
+            description="Test",
+            circuit_breaker=cb
+        )
+
+        spec = workflow.add_task("Spec", "Spec")
+        impl = workflow.add_task("Impl", "Impl", phase=WorkflowPhase.IMPLEMENT)
+        assert workflow.get_tasks_for_phase(WorkflowPhase.SPEC) == [spec]
+
+        spec.phase = WorkflowPhase.IMPLEMENT
+        assert workflow.get_tasks_for_phase(WorkflowPhase.SPEC) == []
+        assert workflow.get_tasks_for_phase(WorkflowPhase.IMPLEMENT) == [spec, impl]
+
+    def test_pending_order_tracks_task_changes(self):
+        """Test pending order follows priority and status changes."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        workflow = Workflow(
+            name="Test Workflow",
+            description="Test",
+            circuit_breaker=cb
+        )
+
+        task1 = workflow.add_task("First", "First")
+        task2 = workflow.add_task("Second", "Second")
+        blocked = workflow.add_task("Blocked", "Blocked", priority=5, dependencies=["missing"])
+        assert workflow.get_pending_tasks() == [blocked, task1, task2]
+        assert workflow.get_next_task() is task1
+
+        task2.priority = 1
+        assert workflow.get_next_task() is task2
+
+        task2.status = TaskStatus.IN_PROGRESS
+        assert workflow.get_pending_tasks() == [blocked, task1]
+
+        task2.status = TaskStatus.PENDING
+        assert workflow.get_pending_tasks() == [blocked, task2, task1]
+
     def test_advance_phase(self):
         """Test phase advancement through TDD workflow."""
         cb = CostCircuitBreaker(budget_limit=1.0)
@@ -327,6 +631,11 @@ class TestWorkflow:
         workflow.advance_phase()
         assert workflow.current_phase == WorkflowPhase.IMPLEMENT
 
+        # The final phase stays put
+        for _ in range(10):
+            workflow.advance_phase()
+        assert workflow.current_phase == WorkflowPhase.DELIVER
+
     def test_to_todo_list(self):
         """Test conversion to TodoWrite format."""
         cb = CostCircuitBreaker(budget_limit=1.0)
@@ -345,6 +654,27 @@ class TestWorkflow:
         assert all("content" in t for t in todo_list)
         assert all("status" in t for t in todo_list)
 
+    def test_to_todo_list_cached_until_change(self):
+        """Test todo dicts are reused until a task changes."""
+        cb = CostCircuitBreaker(budget_limit=1.0)
+        workflow = Workflow(
+            name="Test Workflow",
+            description="Test",
+            circuit_breaker=cb
+        )
+
+        workflow.add_task("Task 1", "Task 1")
+        first = workflow.to_todo_list()
+        assert workflow.to_todo_list()[0] is first[0]
+
+        workflow.tasks[0].status = TaskStatus.IN_PROGRESS
+        changed = workflow.to_todo_list()
+        assert changed[0] is not first[0]
+        assert changed[0]["status"] == "in_progress"
+
+        workflow.add_task("Task 2", "Task 2")
+        assert len(workflow.to_todo_list()) == 2
+
     def test_get_status(self):
         """Test getting workflow status."""
         cb = CostCircuitBreaker(budget_limit=1.0)
@@ -408,6 +738,251 @@ class TestWorkflowEngine:
         test_design_tasks = workflow.get_tasks_for_phase(WorkflowPhase.TEST_DESIGN)
         assert len(test_design_tasks) == 4
 
+    def test_record_event_batching(self, tmp_path):
+        """Test events are buffered and persisted on flush, save and close."""
+        import sqlite3
+        db_path = tmp_path / "workflow.db"
+        engine = WorkflowEngine(budget_limit=1.0, db_path=str(db_path))
+        workflow = engine.create_workflow("Batching")
+
+        def stored_events():
+            with sqlite3.connect(db_path) as conn:
+                return conn.execute("SELECT COUNT(*) FROM workflow_events").fetchone()[0]
+
+        engine.record_event(workflow.id, "TaskStart", "SPEC", agent="planner", tokens_in=10)
+        assert stored_events() == 0
+        engine.flush_events()
+        assert stored_events() == 1
+
+        # A full batch is written by the background writer
+        for _ in range(WorkflowEngine.EVENT_FLUSH_SIZE):
+            engine.record_event(workflow.id, "TaskProgress", "SPEC")
+        deadline = time.monotonic() + 5
+        while stored_events() < 1 + WorkflowEngine.EVENT_FLUSH_SIZE:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert stored_events() == 1 + WorkflowEngine.EVENT_FLUSH_SIZE
+
+        engine.record_event(workflow.id, "TaskEnd", "SPEC")
+        engine._save_workflow(workflow)
+        assert stored_events() == 2 + WorkflowEngine.EVENT_FLUSH_SIZE
+
+        engine.record_event(workflow.id, "WorkflowEnd", "SPEC")
+        engine.close()
+        assert stored_events() == 3 + WorkflowEngine.EVENT_FLUSH_SIZE
+
+    def test_failed_save_keeps_events(self, tmp_path):
+        """Test a rolled-back save leaves its buffered events pending."""
+        import sqlite3
+        db_path = tmp_path / "workflow.db"
+        engine = WorkflowEngine(budget_limit=1.0, db_path=str(db_path))
+        workflow = engine.create_workflow("Rollback")
+        engine.record_event(workflow.id, "TaskStart", "SPEC")
+        engine.record_event(workflow.id, "TaskEnd", "SPEC")
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("ALTER TABLE workflows RENAME TO moved_workflows")
+        with pytest.raises(sqlite3.OperationalError):
+            engine._save_workflow(workflow)
+        assert [row[1] for row in engine._pending_events] == ["TaskStart", "TaskEnd"]
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("ALTER TABLE moved_workflows RENAME TO workflows")
+        engine._save_workflow(workflow)
+        assert len(engine._pending_events) == 0
+        engine.close()
+        with sqlite3.connect(db_path) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM workflow_events").fetchone()[0]
+        assert count == 2
+
+    def test_db_dir_created_once(self, tmp_path, monkeypatch):
+        """Test the database directory is created on first use only."""
+        from pathlib import Path
+        db_dir = tmp_path / "nested" / "dir"
+        WorkflowEngine(budget_limit=1.0, db_path=str(db_dir / "a.db")).close()
+        assert db_dir in WorkflowEngine._ensured_dirs
+
+        def fail_mkdir(self, *args, **kwargs):
+            raise AssertionError("mkdir called again")
+
+        monkeypatch.setattr(Path, "mkdir", fail_mkdir)
+        WorkflowEngine(budget_limit=1.0, db_path=str(db_dir / "b.db")).close()
+        assert (db_dir / "b.db").exists()
+
+    def test_schema_created_in_one_transaction(self, tmp_path, monkeypatch):
+        """Test schema setup commits once and deferred indexes still apply."""
+        import sqlite3
+        statements = []
+        connect = sqlite3.connect
+
+        def traced_connect(*args, **kwargs):
+            conn = connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        monkeypatch.setattr(sqlite3, "connect", traced_connect)
+        engine = WorkflowEngine(budget_limit=1.0, db_path=str(tmp_path / "w.db"))
+        assert statements.count("COMMIT") == 1
+        assert not engine._conn.in_transaction
+
+        engine._conn.execute("DROP INDEX idx_events_wf_ts")
+        engine.create_event_indexes()
+        names = {row[0] for row in engine._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )}
+        engine.close()
+        assert "idx_events_wf_ts" in names
+
+    def test_event_indexes(self, tmp_path):
+        """Test event lookups by workflow and time use an index."""
+        engine = WorkflowEngine(budget_limit=1.0, db_path=str(tmp_path / "w.db"))
+        plan = " ".join(row[-1] for row in engine._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM workflow_events "
+            "WHERE workflow_id = ? ORDER BY timestamp", ("wf",)
+        ))
+        engine.close()
+        assert "idx_events_wf_ts" in plan
+
+    def test_record_event_agent_tiers(self, tmp_path):
+        """Test event costs use the agent's tier and default to Sonnet."""
+        engine = WorkflowEngine(budget_limit=10.0, db_path=str(tmp_path / "w.db"))
+        workflow = engine.create_workflow("Tiers")
+
+        for agent in (None, "no-such-agent", "summarizer"):
+            engine.record_event(workflow.id, "TaskEnd", "SPEC", agent=agent, tokens_in=1000)
+        costs = [row[7] for row in engine._pending_events]
+        engine.close()
+
+        assert costs[0] == costs[1]
+        assert costs[0] == pytest.approx(
+            engine.circuit_breaker.estimate_cost(1000, 0, AgentTier.SONNET.value)
+        )
+        assert costs[2] == pytest.approx(
+            engine.circuit_breaker.estimate_cost(1000, 0, AgentTier.HAIKU.value)
+        )
+
+    def test_record_event_data_round_trip(self, tmp_path):
+        """Test event data is stored as JSON that loads back unchanged."""
+        import json
+        engine = WorkflowEngine(budget_limit=1.0, db_path=str(tmp_path / "w.db"))
+        workflow = engine.create_workflow("Data")
+        data = {"files": ["a.py", "b.py"], "passed": True, "note": "ünïcode"}
+
+        engine.record_event(workflow.id, "TaskEnd", "SPEC", data=data)
+        engine.record_event(workflow.id, "TaskEnd", "SPEC")
+        engine.record_event(workflow.id, "TaskEnd", "SPEC", data={"score": float("nan")})
+        engine.flush_events()
+        stored = [row[0] for row in engine._conn.execute(
+            "SELECT data FROM workflow_events ORDER BY id"
+        )]
+        engine.close()
+        assert stored[0] == json.dumps(data)
+        assert stored[1] is None
+        assert stored[2] == '{"score": NaN}'
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dumps_pretty_paths_agree(self, monkeypatch, use_orjson):
+        """Test indented JSON is identical with and without orjson."""
+        import workflow_engine
+        if use_orjson:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(workflow_engine, "_get_orjson", lambda: None)
+
+        data = {"task": "Write → spec", "tags": ["ü"], "n": 2}
+        assert workflow_engine._dumps_pretty(data) == (
+            '{\n  "task": "Write → spec",\n  "tags": [\n    "ü"\n  ],\n  "n": 2\n}'
+        )
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dumps_compact_paths_agree(self, monkeypatch, use_orjson):
+        """Test compact JSON is identical with and without orjson."""
+        import workflow_engine
+        if use_orjson:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(workflow_engine, "_get_orjson", lambda: None)
+
+        data = {"files": ["a.py"], "note": "ünïcode", "n": 1.5, "ok": None}
+        assert workflow_engine._dumps_compact(data) == (
+            '{"files":["a.py"],"note":"ünïcode","n":1.5,"ok":null}'
+        )
+        with pytest.raises(TypeError):
+            workflow_engine._dumps_compact({"when": datetime(2024, 1, 1)})
+
+    def test_event_writer_failure_keeps_rows(self, tmp_path):
+        """Test a failed background batch is retried and its error surfaced."""
+        import sqlite3
+        db_path = tmp_path / "workflow.db"
+        engine = WorkflowEngine(budget_limit=1.0, db_path=str(db_path))
+        workflow = engine.create_workflow("Writer")
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("ALTER TABLE workflow_events RENAME TO moved_events")
+        for _ in range(WorkflowEngine.EVENT_FLUSH_SIZE):
+            engine.record_event(workflow.id, "TaskProgress", "SPEC")
+        deadline = time.monotonic() + 5
+        while engine._event_writer._error is None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert len(engine._pending_events) == WorkflowEngine.EVENT_FLUSH_SIZE
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("ALTER TABLE moved_events RENAME TO workflow_events")
+        with pytest.raises(sqlite3.OperationalError):
+            engine.flush_events()
+        engine.flush_events()
+        engine.close()
+        with sqlite3.connect(db_path) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM workflow_events").fetchone()[0]
+        assert count == WorkflowEngine.EVENT_FLUSH_SIZE
+
+    def test_iso_now_matches_isoformat(self, monkeypatch):
+        """Test the per-second timestamp cache formats like isoformat()."""
+        from types import SimpleNamespace
+
+        import workflow_engine
+
+        base = int(datetime(2024, 5, 6, 7, 8, 9).timestamp()) * 1_000_000_000
+        for nanos in (base + 123_456_789, base + 999, base + 1_000_000_000):
+            monkeypatch.setattr(
+                workflow_engine, "time", SimpleNamespace(time_ns=lambda n=nanos: n)
+            )
+            expected = datetime.fromtimestamp(nanos // 1000 / 1_000_000).isoformat()
+            assert workflow_engine._iso_now() == expected
+
+    def test_save_workflow_tracks_dirty_tasks(self, tmp_path):
+        """Test saves rewrite task data only when tasks changed."""
+        import json
+        import sqlite3
+        db_path = tmp_path / "workflow.db"
+        engine = WorkflowEngine(budget_limit=1.0, db_path=str(db_path))
+        workflow = engine.create_workflow_from_task("Dirty tracking")
+
+        def stored_row():
+            with sqlite3.connect(db_path) as conn:
+                status, data = conn.execute(
+                    "SELECT status, data FROM workflows WHERE id = ?", (workflow.id,)
+                ).fetchone()
+            return status, json.loads(data)
+
+        status, data = stored_row()
+        assert len(data) == len(workflow.tasks)
+        assert workflow._saved_revision == workflow._revision
+
+        workflow.advance_phase()
+        engine._save_workflow(workflow)
+        status, data = stored_row()
+        assert status == "TEST_DESIGN"
+        assert data[0]["status"] == "pending"
+
+        workflow.tasks[0].status = TaskStatus.COMPLETED
+        assert workflow._saved_revision != workflow._revision
+        engine._save_workflow(workflow)
+        status, data = stored_row()
+        assert data[0]["status"] == "completed"
+        engine.close()
+
     def test_get_agent_for_task(self):
         """Test agent assignment for tasks."""
         engine = WorkflowEngine(budget_limit=1.0)
@@ -425,6 +1000,21 @@ class TestWorkflowEngine:
         assert agent["name"] == "planner"
         assert agent["model"] == "opus"
 
+    def test_get_agent_for_task_phase_defaults(self):
+        """Test unassigned tasks get the default agent for their phase."""
+        engine = WorkflowEngine(budget_limit=1.0)
+
+        task = Task(id="t", content="Test", active_form="Testing",
+                    phase=WorkflowPhase.TEST_DESIGN)
+        assert engine.get_agent_for_task(task) == {
+            "name": "test-writer", "model": "sonnet", "role": "tester"
+        }
+
+        task.assigned_agent = "not-registered"
+        task.phase = WorkflowPhase.VALIDATE
+        agent = engine.get_agent_for_task(task)
+        assert (agent["name"], agent["model"]) == ("validator", "haiku")
+
     def test_generate_claude_md_governance(self):
         """Test TDD CLAUDE.md governance generation."""
         engine = WorkflowEngine(budget_limit=1.0)
@@ -465,6 +1055,109 @@ class TestValidationLayerStack:
         assert validator.project_root == Path(".")
         assert len(validator.results) == 0
 
+    def test_layer_1_static_analysis(self, tmp_path):
+        """Test static analysis flags Python syntax errors."""
+        (tmp_path / "good.py").write_text("x = 1\n")
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+        result = validator.run_layer_1_static_analysis()
+        assert result.layer == "static_analysis"
+        assert result.passed is True
+        assert [c["check"] for c in result.details["checks"]] == ["python_syntax"]
+
+        (tmp_path / "bad.py").write_text("def broken(:\n")
+        result = validator.run_layer_1_static_analysis()
+        assert result.passed is False
+        assert "bad.py" in result.details["checks"][0]["output"]
+
+    def test_layer_1_ignores_vendored_dirs(self, tmp_path):
+        """Test the fallback file walk skips hidden and vendored directories."""
+        for vendored in (".venv", "node_modules"):
+            (tmp_path / vendored).mkdir()
+            (tmp_path / vendored / "broken.py").write_text("def broken(:\n")
+        (tmp_path / "good.py").write_text("x = 1\n")
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+        result = validator.run_layer_1_static_analysis()
+        assert result.passed is True
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_layer_1_checks_only_changed_files(self, tmp_path):
+        """Test static analysis skips Python checks when nothing changed."""
+        (tmp_path / "good.py").write_text("x = 1\n")
+        _init_git_repo(tmp_path)
+
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+        result = validator.run_layer_1_static_analysis()
+        assert result.passed is True
+        assert result.details["checks"][0]["skipped"] == "no python files changed"
+        assert validator._changed_files_cache == frozenset()
+
+        (tmp_path / "bad.py").write_text("def broken(:\n")
+        result = validator.run_layer_1_static_analysis()
+        assert result.passed is False
+        assert validator._changed_files_cache == frozenset({"bad.py"})
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_run_all_layers_memoized(self, tmp_path):
+        """Test an unchanged working tree reuses the previous results."""
+        (tmp_path / "good.py").write_text("x = 1\n")
+        _init_git_repo(tmp_path)
+        (tmp_path / "bad.py").write_text("def broken(:\n")
+
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+        first = validator.run_all_layers()
+        second = validator.run_all_layers()
+        assert [a is b for a, b in zip(first, second)] == [True] * 4
+        assert len(validator.results) == 8
+
+        (tmp_path / "bad.py").write_text("x = 2\n")
+        third = validator.run_all_layers()
+        assert third[0] is not first[0]
+        assert third[0].passed is True
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_run_all_layers_memo_skips_check_errors(self, tmp_path, monkeypatch):
+        """Test a run whose static check could not execute is not memoized."""
+        (tmp_path / "good.py").write_text("x = 1\n")
+        _init_git_repo(tmp_path)
+        (tmp_path / "tsconfig.json").write_text("{}\n")
+        (tmp_path / "app.ts").write_text("let x = 1;\n")
+        monkeypatch.setattr(
+            ValidationLayerStack, "_check_typescript",
+            lambda self: {"check": "typescript", "passed": False, "error": "npx missing"},
+        )
+
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+        first = validator.run_all_layers()
+        assert first[0].details["checks"][0]["error"] == "npx missing"
+        second = validator.run_all_layers()
+        assert second[0] is not first[0]
+        assert not validator._memo
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_run_all_layers_memo_bounded(self, tmp_path, monkeypatch):
+        """Test the memo keeps only the most recently used trees."""
+        import workflow_engine
+
+        monkeypatch.setattr(workflow_engine, "_VALIDATION_MEMO_SIZE", 2)
+        (tmp_path / "good.py").write_text("x = 1\n")
+        _init_git_repo(tmp_path)
+        # A syntax error skips the test layers, which would write caches
+        current = tmp_path / "bad.py"
+        current.write_text("def broken(:\n")
+
+        # Renaming keeps mtime and size, so each name is a distinct tree
+        # that can be returned to
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+        runs = {}
+        for name in ("one", "two", "one", "three", "one", "two"):
+            current = current.rename(tmp_path / f"{name}.py")
+            runs.setdefault(name, []).append(validator.run_all_layers()[0])
+        assert len(validator._memo) == 2
+
+        # "one" was reused before "three" arrived, so "two" was evicted
+        assert runs["one"][0] is runs["one"][1] is runs["one"][2]
+        assert runs["two"][1] is not runs["two"][0]
+
     def test_layer_4_behavioral_diff(self):
         """Test behavioral diff layer."""
         validator = ValidationLayerStack(project_root=".")
@@ -475,6 +1168,121 @@ class TestValidationLayerStack:
         assert result.passed is True  # Informational layer
         assert "changed_files" in result.details or "error" in result.details
 
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_layer_4_single_commit_history(self, tmp_path):
+        """Test a repository without HEAD~1 is diffed against the empty tree."""
+        (tmp_path / "good.py").write_text("x = 1\n")
+        _init_git_repo(tmp_path)
+
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+        result = validator.run_layer_4_behavioral_diff()
+        assert result.details["changed_files"] == ["good.py"]
+        assert result.details["shortstat"] == "1 file changed, 1 insertion(+)"
+
+    @pytest.mark.parametrize("xdist_installed", [True, False])
+    def test_layer_2_runs_pytest_once(self, tmp_path, monkeypatch, xdist_installed):
+        """Test pytest runs once, sharded only when xdist is installed."""
+        import importlib.util
+        import subprocess
+
+        import workflow_engine
+
+        calls = []
+
+        def fake_run(cmd, **kwargs):
+            calls.append(cmd)
+            return subprocess.CompletedProcess(cmd, 4, "", "usage error")
+
+        monkeypatch.setattr(workflow_engine, "_run_with_tail", fake_run)
+        monkeypatch.setattr(workflow_engine.os, "cpu_count", lambda: 8)
+        monkeypatch.setattr(
+            importlib.util, "find_spec",
+            lambda name: object() if xdist_installed else None
+        )
+        result = ValidationLayerStack(project_root=str(tmp_path)).run_layer_2_unit_tests()
+
+        assert len(calls) == 1
+        assert ("-n" in calls[0]) is xdist_installed
+        assert result.passed is False
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_layer_4_no_changes(self, tmp_path):
+        """Test an unchanged tree reports git's empty shortstat."""
+        import subprocess
+        (tmp_path / "good.py").write_text("x = 1\n")
+        _init_git_repo(tmp_path)
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com",
+             "commit", "-q", "--allow-empty", "-m", "empty"],
+            cwd=tmp_path, check=True, capture_output=True
+        )
+
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+        result = validator.run_layer_4_behavioral_diff()
+        assert result.details == {"diff_stat": "", "changed_files": [], "shortstat": ""}
+
+    def test_run_all_layers_fail_fast(self, tmp_path):
+        """Test a static analysis failure skips the test layers."""
+        (tmp_path / "bad.py").write_text("def broken(:\n")
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+
+        results = validator.run_all_layers()
+
+        assert [r.layer for r in results] == [
+            "static_analysis", "unit_tests", "integration_sandbox", "behavioral_diff"
+        ]
+        assert results[1].details == {"skipped": True}
+        assert results[2].details == {"skipped": True}
+        assert validator.results == results
+
+    def test_run_all_layers_without_fail_fast(self, tmp_path):
+        """Test all layers run when fail_fast is disabled."""
+        (tmp_path / "bad.py").write_text("def broken(:\n")
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+
+        results = validator.run_all_layers(fail_fast=False)
+
+        assert [r.layer for r in results] == [
+            "static_analysis", "unit_tests", "integration_sandbox", "behavioral_diff"
+        ]
+        assert results[0].passed is False
+        assert "skipped" not in results[1].details
+        assert validator.results == results
+
+    def test_run_with_tail_keeps_last_lines(self, tmp_path):
+        """Test subprocess output is bounded to the trailing lines."""
+        from workflow_engine import _run_with_tail
+
+        result = _run_with_tail(
+            [sys.executable, "-c", "import sys\nfor i in range(500): print(i)\nsys.exit(3)"],
+            cwd=tmp_path, timeout=30, stdout_lines=5
+        )
+        assert result.returncode == 3
+        assert result.stdout.split() == ["495", "496", "497", "498", "499"]
+
+    def test_layer_3_integration_sandbox(self, tmp_path):
+        """Test sandbox layer reports command output and status."""
+        validator = ValidationLayerStack(project_root=str(tmp_path))
+        result = validator.run_layer_3_integration_sandbox(f"{sys.executable} -c print(42)")
+        assert result.passed is True
+        assert result.details["output"].strip() == "42"
+
+    def test_parse_numstat(self):
+        """Test numstat output is summarized with git's --shortstat wording."""
+        from workflow_engine import _parse_numstat
+
+        details = _parse_numstat("3\t1\tsrc/a.py\x002\t0\tREADME.md\x00-\t-\tlogo.png\x00")
+        assert details["changed_files"] == ["src/a.py", "README.md", "logo.png"]
+        assert details["shortstat"] == "3 files changed, 5 insertions(+), 1 deletion(-)"
+        assert " src/a.py | +3 -1" in details["diff_stat"]
+
+        assert _parse_numstat("0\t2\ta.py\x00")["shortstat"] == "1 file changed, 2 deletions(-)"
+        assert _parse_numstat("-\t-\tlogo.png\x00")["shortstat"] == (
+            "1 file changed, 0 insertions(+), 0 deletions(-)"
+        )
+
+        assert _parse_numstat("") == {"diff_stat": "", "changed_files": [], "shortstat": ""}
+
     def test_get_summary(self):
         """Test validation summary."""
         validator = ValidationLayerStack(project_root=".")
@@ -543,6 +1351,63 @@ class TestWorkflowPhase:
         assert actual == expected
 
 
+# ============================================================================
+# CLI TESTS
+# ============================================================================
+
+class TestMain:
+    """Tests for the workflow engine command-line interface."""
+
+    def test_help_without_command(self, tmp_path, monkeypatch, capsys):
+        """Test no command prints help without opening the database."""
+        from workflow_engine import main
+        monkeypatch.setenv("HOME", str(tmp_path))
+        main([])
+        out = capsys.readouterr().out
+        assert "from-task" in out and "governance" in out
+        assert not (tmp_path / ".claude").exists()
+
+    def test_budget_command(self, tmp_path, monkeypatch, capsys):
+        """Test a subcommand runs with only its own parser registered."""
+        import json
+
+        from workflow_engine import main
+        monkeypatch.setenv("HOME", str(tmp_path))
+        main(["budget"])
+        out = capsys.readouterr().out
+        assert json.loads(out)["limit"] == 1.0
+        # Not a terminal, so the JSON is compact
+        assert out.count("\n") == 1
+
+    def test_json_pretty_on_terminal(self, monkeypatch, capsys):
+        """Test JSON output is indented when stdout is a terminal."""
+        from workflow_engine import _print_json
+        monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
+        _print_json({"a": 1})
+        assert capsys.readouterr().out == '{\n  "a": 1\n}\n'
+
+    def test_governance_written_in_chunks(self, tmp_path, capsys):
+        """Test the governance command streams the full document to disk."""
+        import argparse
+
+        from workflow_engine import _cmd_governance
+        engine = WorkflowEngine(budget_limit=1.0, db_path=str(tmp_path / "wf.db"))
+        workflow = engine.create_workflow_from_task("Write governance")
+        output = tmp_path / "CLAUDE.md"
+        _cmd_governance(argparse.Namespace(workflow_id=workflow.id, output=str(output)), engine)
+        expected = engine.generate_claude_md_governance(workflow).encode("utf-8")
+        assert output.read_bytes() == expected
+        assert "Governance written to" in capsys.readouterr().out
+        engine.close()
+
+    def test_status_unknown_workflow(self, tmp_path, monkeypatch, capsys):
+        """Test status reports a missing workflow id."""
+        from workflow_engine import main
+        monkeypatch.setenv("HOME", str(tmp_path))
+        main(["status", "missing"])
+        assert "Workflow not found: missing" in capsys.readouterr().out
+
+
 # ============================================================================
 # INTEGRATION TESTS
 # ============================================================================